@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+"""Benchmark the zero finders, the pair correlation and the prime
+counting formula, and compare two runs to find regressions.
+
+"""
+
+import sys
+import optparse
+
+from lib import benchmark
+from lib import profiling
+
+if __name__ == '__main__':
+    usage = """
+%prog -k 3 -e 1000,100000 results.json
+%prog -w findzero3 results.json
+%prog -c -t 0.1 old.json new.json
+
+See the description for a list of complete options."""
+    desc = """\
+This program times the transcendental equation and the zero finders
+at fixed indexes around 10^3, 10^5, 10^7 and 10^9, the pair correlation
+and pi(x) with zeros taken from the data tables. The throughput and
+the peak memory of each workload are saved as JSON. With -c two JSON
+files are compared and the regressions are flagged."""
+    parser = optparse.OptionParser(usage=usage, description=desc)
+    parser.add_option('-e', '--heights', dest='heights', action='store',
+                      default=','.join([str(h) for h in benchmark.HEIGHTS]),
+                      help='Comma separated heights (zero indexes).')
+    parser.add_option('-k', '--count', dest='count', action='store',
+                      type='int', default=3,
+                      help='Number of zeros at each height.')
+    parser.add_option('-z', '--numzeros', dest='numzeros', action='store',
+                      type='int', default=1000,
+                      help='Number of zeros for the pair correlation.')
+    parser.add_option('-b', '--bins', dest='bins', action='store',
+                      type='int', default=4,
+                      help='Number of bins of the pair correlation and '\
+                      'number of x values for pi(x).')
+    parser.add_option('-r', '--repeat', dest='repeat', action='store',
+                      type='int', default=1,
+                      help='Repeat each workload and keep the best time.')
+    parser.add_option('-w', '--workload', dest='workload', action='store',
+                      default='', help='Only run workloads whose name '\
+                      'contains this string.')
+    parser.add_option('-c', '--compare', dest='compare', action='store_true',
+                      default=False, help='Compare two JSON files.')
+    parser.add_option('-t', '--threshold', dest='threshold', action='store',
+                      type='float', default=0.1, help='Relative increase '\
+                      'in time or memory flagged as regression.')
+    profiling.add_option(parser)
+    options, args = parser.parse_args()
+    profiling.from_options(options)
+
+    if options.compare:
+        if len(args) < 2:
+            parser.error('You must pass the old and the new JSON files.')
+        table, regressions = benchmark.compare(benchmark.load(args[0]),
+                                               benchmark.load(args[1]),
+                                               options.threshold)
+        print table
+        if regressions:
+            sys.exit(1)
+    else:
+        if not args:
+            parser.error('No output file.')
+        heights = [int(h) for h in options.heights.split(',')]
+        results = benchmark.run(heights, options.count, options.numzeros,
+                                options.bins, options.repeat,
+                                options.workload)
+        benchmark.save(results, args[0])
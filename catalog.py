@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+"""Find the tables of zeros in data/ and read any range of zeros from them.
+
+"""
+
+import sys
+import optparse
+
+from lib import catalog
+from lib import profiling
+
+if __name__ == '__main__':
+    usage = """
+%prog -l
+%prog -m 99990 -n 100010 -k 10 zeros.txt
+%prog -p -m 999999990 -n 1000000010 -k 8
+%prog -a data/zeros_1012/zeros3.txt -f 1000000000001 -b 267653395647
+
+Without an output file the zeros are written to the screen."""
+    desc = """\
+This program keeps an index of the tables of zeros (first index, number
+of zeros and decimal places of each one) and writes the zeros -m...-n
+with at least -k decimal places, taken from the best tables, or from the
+solution of the transcendental equation where no table has them."""
+    parser = optparse.OptionParser(usage=usage, description=desc)
+    parser.add_option('-d', '--directory', dest='directory', action='store',
+                      default=catalog.DATA, help='Directory of the tables.')
+    parser.add_option('-l', '--list', dest='list', action='store_true',
+                      default=False, help='List the tables.')
+    parser.add_option('-r', '--refresh', dest='refresh', action='store_true',
+                      default=False, help='Scan all the tables again.')
+    parser.add_option('-m', '--lowest', dest='lowest', action='store',
+                      type='int', help='Index of the lowest zero.')
+    parser.add_option('-n', '--highest', dest='highest', action='store',
+                      type='int', help='Index of the highest zero.')
+    parser.add_option('-k', '--digits', dest='digits', action='store',
+                      type='int', default=0, help='Decimal places needed.')
+    parser.add_option('-p', '--plan', dest='plan', action='store_true',
+                      default=False, help='Only show where each part of '\
+                      '-m...-n would come from.')
+    parser.add_option('-a', '--add', dest='add', action='store',
+                      default='', help='Add a table whose first index '\
+                      'is -f, with -b added to every zero.')
+    parser.add_option('-f', '--first', dest='first', action='store',
+                      type='int', default=1,
+                      help='Index of the first zero of the table of -a.')
+    parser.add_option('-b', '--base', dest='base', action='store',
+                      type='float', default=0.0,
+                      help='Number added to the zeros of the table of -a.')
+    profiling.add_option(parser)
+    options, args = parser.parse_args()
+    profiling.from_options(options)
+
+    c = catalog.Catalog(options.directory, options.refresh)
+    if options.add:
+        c.add(options.add, options.first, options.base)
+    if options.list:
+        for s in sorted(c.sources, key=lambda s: (s.first, s.source)):
+            print '%-60s %14i %8i %4i' % (s.source, s.first, s.count,
+                                          s.digits)
+    elif options.lowest and options.highest:
+        if options.plan:
+            for s, a, b in c.plan(options.lowest, options.highest,
+                                  options.digits):
+                print '%i..%i\t%s' % (a, b, s.source if s else 'solver')
+            sys.exit()
+        output = open(args[0], 'w') if args else sys.stdout
+        for row in c.rows(options.lowest, options.highest, options.digits):
+            output.write(row + '\n')
+    elif not options.add:
+        parser.print_help()
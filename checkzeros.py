@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+"""Verify a table of Riemann zeros in parallel.
+
+"""
+
+import sys
+import optparse
+
+from lib import check
+from lib import certify
+from lib import profiling
+
+if __name__ == '__main__':
+    usage = """
+%prog -q 1 zeros.txt bad_indexes.txt
+%prog -q 999990000 -d 6 -p 8 -c 200 zeros_around109.txt bad_indexes.txt
+%prog -r -q 99991 -d 12 -c 10 zeros.txt intervals.txt
+
+See the description for a list of complete options."""
+    desc = """\
+This program checks every zero of a table (text, .npy or raw float64
+.bin). It evaluates the transcendental equation slightly off the critical
+line, which must be close to zero (or to +-1 at the close pairs), and
+checks that Z(t) changes sign around each zero. The indexes of the bad zeros are written, one per line,
+to the output file, which can be used with genzeros.py -s and -r. With
+-r each zero is proven with interval arithmetic instead, and the output
+has the index of each zero and an interval that holds exactly that zero;
+the zeros that could not be proven are printed."""
+    parser = optparse.OptionParser(usage=usage, description=desc)
+    parser.add_option('-q', '--first', dest='first', action='store',
+                      default=1, type='int',
+                      help="Index of the first zero in the table.")
+    parser.add_option('-d', '--decimal', dest='decimal', action='store',
+                      default=0, type='int', help="Decimal places to be "\
+                      "verified. By default it is guessed from the table.")
+    parser.add_option('-p', '--processes', dest='processes', action='store',
+                      default=None, type='int', help="Number of processes. "\
+                      "By default the number of cores.")
+    parser.add_option('-c', '--chunk', dest='chunk', action='store',
+                      default=500, type='int', help="Number of zeros sent "\
+                      "to a process at a time.")
+    parser.add_option('-t', '--tolerance', dest='tolerance', action='store',
+                      default=0.25, type='float', help="Largest distance "\
+                      "of the residual of the transcendental equation "\
+                      "from 0, or from +-1, accepted.")
+    parser.add_option('-r', '--certify', dest='certify', action='store_true',
+                      default=False, help="Certify the zeros with interval "\
+                      "arithmetic.")
+    parser.add_option('-w', '--radius', dest='radius', action='store',
+                      default=1e-6, type='float', help="Half width of the "\
+                      "first interval around each zero, for -r.")
+    profiling.add_option(parser)
+    options, args = parser.parse_args()
+    profiling.from_options(options)
+
+    if len(args) < 2:
+        parser.error('You must pass the table and the output file.')
+    if options.certify:
+        bad = certify.certify_table(args[0], args[1], options.first,
+                                    options.decimal, options.processes,
+                                    options.chunk, options.radius)
+        for n, y in bad:
+            print "n=%i\tzero=%s not certified" % (n, y)
+        print "%i zeros not certified" % len(bad)
+        sys.exit()
+    bad = check.verify(args[0], options.first, options.decimal,
+                       options.processes, options.chunk, options.tolerance)
+    check.write_bad(bad, args[1])
+    for n, res, sign in bad:
+        print "n=%i\tresidual=%.6f\tsign change=%s" % (n, res, sign)
+    print "%i bad zeros" % len(bad)
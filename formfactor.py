@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+"""Compute the two point function or the form factor of the zeros with FFT.
+
+"""
+
+import optparse
+
+from lib import formfactor
+from lib import unfold
+from lib import profiling
+
+if __name__ == '__main__':
+    usage = """
+%prog -i zeros.txt -m 1 -n 100000 -a 0 -b 1.95 -s 0.05 r2.txt
+%prog -x unfolded.npy -k k -a 0 -b 2 -s 0.1 -t hann formfactor.txt
+
+The output has the same columns as the tables of gue.py and can be
+plotted with guegraph.py."""
+    desc = """\
+This program computes the two point function R2 (-k r2) or the form
+factor K (-k k) of unfolded zeros through FFT, with the predictions of
+GUE, 1-(sin pi x/pi x)^2 and min(tau, 1)."""
+    parser = optparse.OptionParser(usage=usage, description=desc)
+    parser.add_option('-i', '--input', dest='input_file', action='store',
+                      default='', help='Input file with zeros.')
+    parser.add_option('-m', '--lowest', dest='lowest', action='store',
+                      type='int', help='Index of the lowest zero.')
+    parser.add_option('-n', '--highest', dest='highest', action='store',
+                      type='int', help='Index of the highest zero.')
+    parser.add_option('-f', '--first', dest='first', action='store',
+                      default=1, type='int',
+                      help='The index of the first zero of the file.')
+    parser.add_option('-e', '--method', dest='method', action='store',
+                      default='smooth', choices=unfold.METHODS,
+                      help='Unfolding method: %s.' % ', '.join(unfold.METHODS))
+    parser.add_option('-x', '--unfolded', dest='unfolded', action='store',
+                      default='', help='Unfolded zeros saved by gue.py -o, '\
+                      'instead of -i.')
+    parser.add_option('-k', '--kind', dest='kind', action='store',
+                      default='r2', choices=['r2', 'k'],
+                      help='r2 for the two point function, k for the '\
+                      'form factor.')
+    parser.add_option('-a', '--min', dest='min', action='store',
+                      type='float', default=0.0,
+                      help='Lowest x or tau.')
+    parser.add_option('-b', '--max', dest='max', action='store',
+                      type='float', default=1.95,
+                      help='Highest x or tau.')
+    parser.add_option('-s', '--step', dest='step', action='store',
+                      type='float', default=0.05, help='Width of the bins.')
+    parser.add_option('-d', '--dx', dest='dx', action='store',
+                      type='float', default=0.0,
+                      help='Width of the cells of the grid.')
+    parser.add_option('-t', '--taper', dest='taper', action='store',
+                      default='', choices=[''] + formfactor.WINDOWS.keys(),
+                      help='Window: %s.' % ', '.join(formfactor.WINDOWS))
+    profiling.add_option(parser)
+    options, args = parser.parse_args()
+    profiling.from_options(options)
+
+    if not args:
+        parser.error('No output file.')
+    if options.unfolded:
+        x = unfold.load(options.unfolded)
+    elif options.input_file and options.lowest and options.highest:
+        x = unfold.unfold_file(options.input_file, '', options.lowest,
+                               options.highest, options.first,
+                               options.method)
+    else:
+        parser.print_help()
+        parser.exit()
+
+    formfactor.main(x, args[0], options.kind, (options.min, options.max),
+                    options.step, options.dx, options.taper)
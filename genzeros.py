@@ -17,6 +17,10 @@ Cornell University, Physics Department
 import optparse
 
 from lib import zeros
+from lib import telemetry
+from lib import tuning
+from lib import lfunctions
+from lib import profiling
 
 if __name__ == '__main__':
     usage = """
@@ -27,6 +31,13 @@ if __name__ == '__main__':
 %prog -s -i list_zeros.txt output.txt
 %prog -r -q 1 -x line_numbers.txt -y new_zeros.txt original.txt new_one.txt
 %prog -z -f zeros.txt -i indexes.txt output.txt
+%prog -m 1 -n 50 -g solver.log goodzeros50.txt
+%prog -u -b 10 solver.log
+%prog -a -m 99000 -n 100000 -f zeros.txt -q 1 -k 20 -d 6 findzero3.profile
+%prog -m 1 -n 50 -t findzero3.profile goodzeros50.txt
+%prog -m 1 -n 50 -e 5 lzeros50
+%prog -w -m 99000 -n 100000 goodzeros.txt
+%prog -j -m 99000 -n 100000 -g solver.log goodzeros.txt
 
 See the description for a list of complete options."""
     desc = """\
@@ -81,7 +92,50 @@ It can also have other options. See the description of each one.
                       action='store_true', default=False, 
                       help="Try to fix pathological zeros. Must set -f and "\
                       "-i options.")
+    parser.add_option('-g', '--log', dest='log', action='store',
+                      default='', help="Write the solver statistics of "\
+                      "each zero to this file. Used when solving the "\
+                      "transcendental equation and with -s option.")
+    parser.add_option('-u', '--summary', dest='summary', action='store_true',
+                      default=False, help="Print a summary of the solver "\
+                      "log passed as argument.")
+    parser.add_option('-b', '--band', dest='band', action='store',
+                      default=0, type='int', help="Group the summary in "\
+                      "bands with this number of zeros. Only used with "\
+                      "-u option.")
+    parser.add_option('-a', '--autotune', dest='autotune',
+                      action='store_true', default=False,
+                      help="Tune the parameters of the solver for the "\
+                      "band -m...-n against the reference table in -f, "\
+                      "whose first zero has index -q. The profile is "\
+                      "written in the file passed as argument. The "\
+                      "precision is given by -d.")
+    parser.add_option('-k', '--samples', dest='samples', action='store',
+                      default=20, type='int', help="Number of indexes "\
+                      "sampled with -a option.")
+    parser.add_option('-t', '--profile', dest='profile', action='store',
+                      default='', help="Profile with the parameters of the "\
+                      "solver for each band. By default %s is used if it "\
+                      "exists in the current directory." % tuning.PROFILE)
+    parser.add_option('-e', '--modulus', dest='modulus', action='store',
+                      default=0, type='int', help="Zeros -m...-n of the "\
+                      "L-functions of all the primitive Dirichlet "\
+                      "characters with this modulus, one file per "\
+                      "character, whose names start with the argument.")
+    parser.add_option('-w', '--prepass', dest='prepass', action='store_true',
+                      default=False, help="Find the zeros likely to be "\
+                      "pathological from Z at the Gram points, and solve "\
+                      "them with the parameters of -s from the start "\
+                      "(those of -t with a sharper tolerance if -t is "\
+                      "given).")
+    parser.add_option('-j', '--predict', dest='predict', action='store_true',
+                      default=False, help="Start the search of each zero "\
+                      "from the Lambert formula corrected by the Stirling "\
+                      "series of theta and an estimate of S(t), which is "\
+                      "closer to the zero.")
+    profiling.add_option(parser)
     options, args = parser.parse_args()
+    profiling.from_options(options)
 
     if options.odlyzko:
         if not options.prefix:
@@ -105,7 +159,22 @@ It can also have other options. See the description of each one.
         if not args:
             parser.error("No output file.")
         indexes_list = [int(x) for x in open(options.indexes)]
-        zeros.good_specific(indexes_list, args[0])
+        zeros.good_specific(indexes_list, args[0], options.log,
+                            options.profile)
+    elif options.autotune:
+        if not (options.lowest and options.highest and options.odlyzko_file):
+            parser.error("You must set -m, -n and -f options.")
+        profile = args[0] if args else tuning.PROFILE
+        rate, cost, params = tuning.autotune(options.lowest, options.highest,
+                                options.odlyzko_file, profile, options.first,
+                                options.samples, int(options.decimal))
+        print "Best: epsilon=%.5f, step=%.3f, incr=%.3f, step_max=%.2f, "\
+              "success %.3f, evaluations/zero %.2f" % (params['epsilon'],
+              params['step'], params['incr'], params['step_max'], rate, cost)
+    elif options.summary:
+        if not args:
+            parser.error("You must pass the log file.")
+        print telemetry.summary(args[0], options.band)
     elif options.replace:
         if not (options.linenumbers and options.newzeros):
             parser.error("You must pass a file with the line "\
@@ -128,8 +197,13 @@ It can also have other options. See the description of each one.
             parser.error('You must set --lowest and --highest options.')
         if not args:
             parser.error('You must pass a filename for output.')
-        if options.lambert:
+        if options.modulus:
+            lfunctions.goodzeros(options.modulus, options.lowest,
+                                 options.highest, args[0])
+        elif options.lambert:
             zeros.approxzeros(options.lowest, options.highest, args[0])
         else:
-            zeros.goodzeros(options.lowest, options.highest, args[0])
+            zeros.goodzeros(options.lowest, options.highest, args[0],
+                            options.log, options.profile, options.prepass,
+                            options.predict)
 
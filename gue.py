@@ -11,10 +11,18 @@ Cornell University, Physics Department
 import optparse
 
 from lib import gue2
+from lib import counting
+from lib import unfold
+from lib import randmat
+from lib import profiling
 
 if __name__ == '__main__':
     usage = """
-%prog -i zeros.txt -m 1 -n 1000 -a 1.0 -b 3.05 -s 0.05 -f 1 gue_output.txt \
+%prog -i zeros.txt -m 1 -n 1000 -a 1.0 -b 3.05 -s 0.05 -f 1 gue_output.txt
+%prog -i zeros.txt -u 371866693 -v 371870000 -a 0 -b 1.95 -s 0.05 gue.txt \
+%prog -i zeros.txt -m 90000 -n 100000 -o unfolded.npy
+%prog -x unfolded.npy -a 0 -b 1.95 -s 0.05 gue.txt
+%prog -r 1000000 -z 2000 -c 1 -a 0 -b 1.95 -s 0.05 gue_matrices.txt
 """
     desc = """\
 This program computes the pair correlation function and
@@ -40,10 +48,79 @@ to the output file."""
     parser.add_option('-f', '--first', dest='first', action='store',
                       default=0, type='int', 
                       help='The index of the first zero.')
+    parser.add_option('-u', '--lowheight', dest='lowheight', action='store',
+                      type='float', default=0, help='Lowest height of the '\
+                      'window. Use with -v instead of -m and -n.')
+    parser.add_option('-v', '--highheight', dest='highheight',
+                      action='store', type='float', default=0,
+                      help='Highest height of the window. If -f is not '\
+                      'given the index of the first zero of the file is '\
+                      'found from its height.')
+    parser.add_option('-o', '--unfold', dest='unfold', action='store',
+                      default='', help='Save the unfolded zeros -m...-n '\
+                      'in this .npy file, for -x.')
+    parser.add_option('-e', '--method', dest='method', action='store',
+                      default='smooth', choices=unfold.METHODS,
+                      help='Unfolding method: %s.' % ', '.join(unfold.METHODS))
+    parser.add_option('-w', '--window', dest='window', action='store',
+                      default=0, type='int', help='Number of zeros of the '\
+                      'window of the method "window", 0 for all.')
+    parser.add_option('-x', '--unfolded', dest='unfolded', action='store',
+                      default='', help='Compute the table from unfolded '\
+                      'zeros saved with -o, instead of -i.')
+    parser.add_option('-r', '--random', dest='random', action='store',
+                      default=0, type='int', help='Compute the table for '\
+                      'this number of eigenvalues of random GUE matrices.')
+    parser.add_option('-z', '--size', dest='size', action='store',
+                      default=randmat.SIZE, type='int',
+                      help='Size of the matrices of -r.')
+    parser.add_option('-c', '--seed', dest='seed', action='store',
+                      default=0, type='int', help='Seed of the matrices of -r.')
+    parser.add_option('-j', '--processes', dest='processes', action='store',
+                      default=0, type='int', help='Number of processes for '\
+                      '-r, all the cores by default.')
+    profiling.add_option(parser)
     options, args = parser.parse_args()
+    profiling.from_options(options)
 
-    if not args:
+    if options.random:
+        if not (args and options.alphamin != -1 and options.alphamax and 
+                options.step):
+            parser.print_help()
+            parser.exit()
+        spectra = randmat.main(options.random, args[0], 
+                               [options.alphamin, options.alphamax],
+                               options.step, options.size, options.seed,
+                               options.processes or None)
+        if options.unfold:
+            randmat.save(options.unfold, spectra)
+        parser.exit()
+    if options.unfolded:
+        if not (args and options.alphamin != -1 and options.alphamax and 
+                options.step):
+            parser.print_help()
+            parser.exit()
+        gue2.main_unfolded(options.unfolded, 
+                           [options.alphamin, options.alphamax], options.step,
+                           args[0])
+        parser.exit()
+    if not (args or options.unfold):
         parser.error('No output file.')
+    if options.input_file and options.lowheight and options.highheight:
+        zindex = counting.ZeroIndex(options.input_file, options.first)
+        options.lowest, options.highest = zindex.window(options.lowheight,
+                                                        options.highheight)
+        options.first = zindex.first
+        print 'Zeros %i...%i' % (options.lowest, options.highest)
+    if options.unfold:
+        if not (options.input_file and options.lowest and options.highest):
+            parser.print_help()
+            parser.exit()
+        unfold.unfold_file(options.input_file, options.unfold, 
+                           options.lowest, options.highest, 
+                           options.first or 1, options.method, options.window)
+        if not args:
+            parser.exit()
     if not (options.input_file and options.lowest and options.highest and
             options.alphamin != -1 and options.alphamax and options.step):
         parser.print_help()
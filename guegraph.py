@@ -11,6 +11,7 @@ Cornell University, Physics Department
 import optparse
 
 from lib import graphs
+from lib import profiling
 
 def gue_graph(input_file, output, title, xmin=0.01, xmax=1.9, ymin=0, 
               ymax=1.2, colorline='#708DFF', colordot='#FF0000', linewidth=2,
@@ -34,6 +35,8 @@ def gue_graph(input_file, output, title, xmin=0.01, xmax=1.9, ymin=0,
 if __name__ == '__main__':
     usage = """
 %prog -i gue.txt -t '$n=1\dotsc 10^3$' -a 0 -b 3 -c 0 -d 1.2 -s 3 graph.pdf
+%prog --batch -o graphs/ -j 4 data/ 'more/gue_*.txt'
+%prog --overlay -n '$10^5$,$10^9$,$10^{12}$' compare.pdf gue5.txt gue9.txt gue12.txt
 
 See the description for a list of complete options."""
     desc = """Make a plot of GUE pair correlation conjecture."""
@@ -74,7 +77,56 @@ See the description for a list of complete options."""
     parser.add_option('-y', '--legend2', dest='legend2', action='store',
                       default='',
                       help="Legend for the dots (optional).")
+    parser.add_option('-k', '--batch', dest='batch', action='store_true',
+                      default=False, help='Render every table given as '\
+                      'argument (files, directories or globs) to -o.')
+    parser.add_option('-o', '--outdir', dest='outdir', action='store',
+                      default='.', help='Output directory of --batch.')
+    parser.add_option('-e', '--format', dest='format', action='store',
+                      default='pdf', help='Output format of --batch.')
+    parser.add_option('-j', '--processes', dest='processes', action='store',
+                      default=1, type='int',
+                      help='Number of processes for --batch.')
+    parser.add_option('-v', '--overlay', dest='overlay', action='store_true',
+                      default=False, help='Compare the tables given after '\
+                      'the output file in one graph.')
+    parser.add_option('-g', '--grid', dest='grid', action='store_true',
+                      default=False, help='Compare the tables given after '\
+                      'the output file side by side.')
+    parser.add_option('-n', '--labels', dest='labels', action='store',
+                      default='', help='Comma separated labels of the '\
+                      'tables of --overlay or --grid.')
+    parser.add_option('-f', '--fast', dest='fast', action='store_true',
+                      default=False, help='Render without LaTeX and '\
+                      'without a display (or set RIEMANN_PLOTS=fast).')
+    profiling.add_option(parser)
     options, args = parser.parse_args()
+    profiling.from_options(options)
+
+    if options.fast:
+        graphs.use_profile('fast', headless=True)
+
+    if options.batch:
+        if not args:
+            parser.error('No input tables.')
+        outputs = graphs.gue_batch(args, options.outdir, options.format,
+                    options.processes, title=options.title or '',
+                    xmin=options.xmin, xmax=options.xmax, ymin=options.ymin,
+                    ymax=options.ymax, color_gue=options.colorline,
+                    color_points=options.colordots,
+                    linewidth=options.linewidth,
+                    markersize=options.dotssize, symbol=options.marker)
+        print '%i graphs written to %s' % (len(outputs), options.outdir)
+        parser.exit()
+    if options.overlay or options.grid:
+        if len(args) < 2:
+            parser.error('No output file and input tables.')
+        labels = options.labels.split(',') if options.labels else None
+        graphs.gue_compare(args[0], args[1:], labels,
+                           'grid' if options.grid else 'overlay',
+                           options.xmin, options.xmax, options.ymin,
+                           options.ymax, markersize=options.dotssize)
+        parser.exit()
 
     if not args:
         parser.error('No output file. Must be PDF.')
@@ -1,3 +1,10 @@
 
-__all__ = ['graphs.py', 'gue1.py',  'gue2.py', 'zeros.py']
+__all__ = ['graphs.py', 'gue1.py',  'gue2.py', 'zeros.py', 'telemetry.py',
+           'benchmark.py', 'tuning.py', 'check.py',
+           'counting.py', 'cache.py', 'sampling.py',
+           'tables.py', 'unfold.py', 'formfactor.py',
+           'randmat.py', 'lfunctions.py', 'sweep.py',
+           'service.py', 'catalog.py', 'packed.py',
+           'certify.py', 'zeroarray.py', 'pathology.py',
+           'profiling.py']
 
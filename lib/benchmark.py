@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+
+"""
+Benchmarks for the expensive parts of the project: the transcendental
+equation and the zero finders at fixed indexes around several heights,
+the pair correlation and the prime counting formula with the zeros in
+the `data/` tables.
+
+Each workload runs in its own process, so the peak memory is not
+polluted by the previous ones. The results are saved as JSON and two
+runs can be compared to flag regressions.
+
+"""
+
+import os
+import json
+import Queue
+import time
+import platform
+import resource
+import functools
+import multiprocessing
+
+import mpmath
+
+import zeros
+import gue1
+import gue2
+import prime
+
+
+HEIGHTS = [10**3, 10**5, 10**7, 10**9]
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+ZEROS_105 = os.path.join(DATA, 'final_zeros_105', 'ourzeros105_final.txt')
+ZEROS_109 = os.path.join(DATA, 'final_zeros_109', 'truezeros_around109.txt')
+
+def indexes(height, count):
+    """The fixed set of indexes used at a given height."""
+    return range(height, height+count)
+
+def _transeq(ns):
+    for n in ns:
+        zeros.transeq(n, zeros.zerow(n))
+
+def _solver(solver, ns):
+    for n in ns:
+        solver(n)
+
+def _read(filename, n):
+    return [mpmath.mpf(l.strip()) for i, l in enumerate(open(filename))
+            if i < n]
+
+def _gue1(somezeros, bins):
+    t = zeros.zerow(len(somezeros))
+    for a, b in bins:
+        gue1.pair_correlation(somezeros, t, a, b)
+
+def _gue2(somezeros, bins):
+    for a, b in bins:
+        gue2.pair_correlation(somezeros, a, b)
+
+def _pi(somezeros, xvals):
+    for x in xvals:
+        prime.pi_zeros(x, somezeros)
+
+def workloads(heights=HEIGHTS, count=3, num_zeros=1000, num_bins=4):
+    """Return the list of workloads as tuples
+
+        (name, mp.dps, number of calls, setup, function)
+
+    `setup` is called before the timer starts and its result is passed
+    to `function`. The number of calls is used to compute the throughput.
+
+    """
+    bins = [(0.05*i, 0.05*(i+1)) for i in range(10, 10+num_bins)]
+    xvals = [10.0 + 2.0*i for i in range(num_bins)]
+    w = []
+    for h in heights:
+        ns = indexes(h, count)
+        w.append(('transeq_%i' % h, 20, count, lambda ns=ns: ns, _transeq))
+        for solver in [zeros.findzero, zeros.findzero3, zeros.findzero_exact]:
+            name = '%s_%i' % (solver.__name__, h)
+            w.append((name, 20, count, lambda ns=ns: ns,
+                      functools.partial(_solver, solver)))
+    w.append(('gue1_pair_correlation', 15, num_bins,
+              lambda: _read(ZEROS_105, num_zeros),
+              functools.partial(_gue1, bins=bins)))
+    w.append(('gue2_pair_correlation', 15, num_bins,
+              lambda: _read(ZEROS_109, num_zeros/4),
+              functools.partial(_gue2, bins=bins)))
+    w.append(('prime_pi_zeros', 20, num_bins,
+              lambda: _read(ZEROS_105, 20),
+              functools.partial(_pi, xvals=xvals)))
+    return w
+
+def _run(workload, repeat, queue):
+    """Executed in a child process."""
+    name, dps, calls, setup, function = workload
+    mpmath.mp.dps = dps
+    try:
+        data = setup()
+        times = []
+        for i in range(repeat):
+            t = time.time()
+            function(data)
+            times.append(time.time() - t)
+    except Exception, e:
+        queue.put((None, '%s: %s' % (e.__class__.__name__, e)))
+        return
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((min(times), maxrss))
+
+def _result(p, queue, wait=1.0):
+    """What the child `p` put in `queue`, or a failure if it died
+    without putting anything (killed, out of memory, ...).
+
+    """
+    while True:
+        try:
+            return queue.get(timeout=wait)
+        except Queue.Empty:
+            if not p.is_alive():
+                try:
+                    return queue.get(timeout=wait)
+                except Queue.Empty:
+                    p.join()
+                    return None, 'process died with exit code %s' % \
+                                 p.exitcode
+
+def run(heights=HEIGHTS, count=3, num_zeros=1000, num_bins=4, repeat=1,
+        only='', verbose=True):
+    """Run the workloads and return a dictionary with the results.
+    `only` is a substring used to select some of the workloads.
+
+    """
+    results = {}
+    for workload in workloads(heights, count, num_zeros, num_bins):
+        name, dps, calls = workload[:3]
+        if only and only not in name:
+            continue
+        queue = multiprocessing.Queue()
+        p = multiprocessing.Process(target=_run,
+                                    args=(workload, repeat, queue))
+        p.start()
+        t, maxrss = _result(p, queue)
+        p.join()
+        if t is None:
+            if verbose:
+                print '%-28s failed, %s' % (name, maxrss)
+            results[name] = {'error': maxrss}
+            continue
+        results[name] = {'calls': calls, 'time': t,
+                         'throughput': calls/t if t else 0.0,
+                         'maxrss_kb': maxrss}
+        if verbose:
+            print '%-28s %8.3f s %10.3f calls/s %8i KB' % \
+                  (name, t, results[name]['throughput'], maxrss)
+    return {'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'host': platform.node(),
+            'python': platform.python_version(),
+            'mpmath': mpmath.__version__,
+            'mpmath_backend': mpmath.libmp.BACKEND,
+            'parameters': {'heights': heights, 'count': count,
+                           'num_zeros': num_zeros, 'num_bins': num_bins,
+                           'repeat': repeat},
+            'results': results}
+
+def save(results, filename):
+    f = open(filename, 'w')
+    json.dump(results, f, indent=1, sort_keys=True)
+    f.close()
+
+def load(filename):
+    return json.load(open(filename))
+
+def compare(old, new, threshold=0.1):
+    """Compare two runs, given as the dictionaries returned by `run`.
+    A workload is flagged when its time or its memory grew by more than
+    `threshold`. Return the printable table and the list of regressions.
+
+    """
+    lines = ['%-28s %10s %10s %8s %8s' % ('workload', 'old (s)', 'new (s)',
+                                         'time', 'memory')]
+    regressions = []
+    for name in sorted(new['results']):
+        if name not in old['results']:
+            continue
+        a = old['results'][name]
+        b = new['results'][name]
+        if 'error' in b and 'error' not in a:
+            regressions.append(name)
+            lines.append('%-28s %10.3f %10s %8s %8s REGRESSION' % \
+                         (name, a['time'], 'failed', '', ''))
+            continue
+        elif 'error' in a or 'error' in b:
+            continue
+        rtime = b['time']/a['time'] if a['time'] else 1.0
+        rmem = float(b['maxrss_kb'])/a['maxrss_kb'] if a['maxrss_kb'] else 1.0
+        flag = ''
+        if rtime > 1.0 + threshold or rmem > 1.0 + threshold:
+            flag = 'REGRESSION'
+            regressions.append(name)
+        lines.append('%-28s %10.3f %10.3f %7.2fx %7.2fx %s' % \
+                     (name, a['time'], b['time'], rtime, rmem, flag))
+    return '\n'.join(lines) + '\n', regressions
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+
+"""
+On disk cache for the curves sampled in the graphs.
+
+Sampling the transcendental equation or arg zeta over a grid takes
+minutes, while changing a color of the figure takes nothing. Here every
+sampled curve is saved as a .npy file whose name is a hash of the
+function (its name, its code and the source of its module), the fixed
+arguments, the grid and the precision mp.dps. So the same curve is never
+computed twice, and a change in any of these computes a new one. A
+change in another module the function calls is not seen, so then the
+cache must be cleared with `clear`.
+
+The directory is given by the environment variable RIEMANN_CACHE, by
+default ~/.cache/riemann_zeta, and when its size goes above
+RIEMANN_CACHE_SIZE megabytes (default 500) the least recently used
+curves are removed.
+
+"""
+
+import os
+import sys
+import hashlib
+import functools
+
+import numpy
+import mpmath
+
+import sampling
+
+
+CACHE_DIR = os.environ.get('RIEMANN_CACHE',
+                os.path.join(os.path.expanduser('~'), '.cache',
+                             'riemann_zeta'))
+MAX_BYTES = int(os.environ.get('RIEMANN_CACHE_SIZE', 500))*1024*1024
+_sources = {}
+
+def _source(f):
+    """Hash of the source of the module defining `f`, '' if unknown."""
+    module = sys.modules.get(getattr(f, '__module__', None))
+    filename = getattr(module, '__file__', None)
+    if not filename:
+        return ''
+    if filename.endswith(('.pyc', '.pyo')):
+        filename = filename[:-1]
+    if filename not in _sources:
+        try:
+            _sources[filename] = hashlib.sha1(open(filename, 'rb').read()
+                                             ).hexdigest()
+        except IOError:
+            _sources[filename] = ''
+    return _sources[filename]
+
+def key(f, args, grid):
+    """Hash of the function, its fixed arguments, the grid and mp.dps."""
+    h = hashlib.sha1()
+    while isinstance(f, functools.partial):
+        args = tuple(f.args) + tuple(args)
+        if f.keywords:
+            h.update(repr(sorted(f.keywords.items())))
+        f = f.func
+    code = getattr(f, 'func_code', None)
+    h.update('%s.%s' % (getattr(f, '__module__', ''), f.__name__))
+    if code:
+        h.update(code.co_code)
+        h.update(repr(code.co_consts))
+    h.update(_source(f))
+    h.update(repr([repr(a) for a in args]))
+    h.update(numpy.ascontiguousarray(grid, dtype=numpy.float64).tostring())
+    h.update(str(mpmath.mp.dps))
+    return h.hexdigest()
+
+def _number(v):
+    if isinstance(v, (mpmath.mpc, complex)):
+        return complex(v)
+    return float(v)
+
+def _array(values):
+    values = [_number(v) for v in values]
+    if [v for v in values if isinstance(v, complex)]:
+        return numpy.array(values, dtype=numpy.complex128)
+    return numpy.array(values, dtype=numpy.float64)
+
+def compute(f, grid, args=()):
+    """Sample f(*args, x) for every x in `grid`, without cache."""
+    return _array(sampling.sample(f, grid, args))
+
+def curve(f, grid, *args):
+    """Return the array f(*args, x) for every x in `grid`, taken from the
+    cache if we already computed it.
+
+    """
+    grid = numpy.asarray(grid, dtype=numpy.float64)
+    path = os.path.join(CACHE_DIR, key(f, args, grid) + '.npy')
+    if os.path.exists(path):
+        os.utime(path, None) # mark as recently used
+        return numpy.load(path)
+    values = compute(f, grid, args)
+    save(path, values)
+    return values
+
+def value(f, *args):
+    """Cache a single value f(*args), e.g. a zero shown in the figure."""
+    path = os.path.join(CACHE_DIR, key(f, args, []) + '.npy')
+    if os.path.exists(path):
+        os.utime(path, None)
+        return numpy.load(path)[0]
+    v = _array([f(*args)])
+    save(path, v)
+    return v[0]
+
+def save(path, values):
+    if not os.path.isdir(CACHE_DIR):
+        os.makedirs(CACHE_DIR)
+    # write and rename, so a killed process doesn't leave half a curve
+    tmp = path + '.%i.tmp' % os.getpid()
+    f = open(tmp, 'wb')
+    numpy.save(f, values)
+    f.close()
+    os.rename(tmp, path)
+    evict()
+
+def evict(max_bytes=MAX_BYTES):
+    """Remove the least recently used curves until the cache is smaller
+    than `max_bytes`.
+
+    """
+    if not os.path.isdir(CACHE_DIR):
+        return
+    files = []
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith('.npy'):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        st = os.stat(path)
+        files.append((st.st_mtime, st.st_size, path))
+    total = sum([f[1] for f in files])
+    for mtime, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        os.remove(path)
+        total -= size
+
+def clear():
+    evict(0)
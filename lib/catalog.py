@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+
+"""
+A catalog of the tables of zeros in data/.
+
+We have many tables for the same ranges (odlyzko_zeros1.txt,
+ourzeros105_final.txt, silva_105.txt, yBrent105.dat, ...), each one with
+its own first index and number of digits. The catalog finds every
+table of contiguous zeros in the data directory and records its
+
+    source   the path, relative to the directory
+    first    the index of its first zero, from its height (see
+             `counting.first_index`)
+    count    the number of zeros
+    digits   the number of correct decimal places: the decimals
+             written, or what a float64 keeps if the zeros were written
+             from doubles with %.20f, as ourzeros_around109.txt
+    base     a constant added to every row, for tables like
+             zeros_1012/zeros3.txt which only have gamma - 267653395647
+
+A table is contiguous if the index of its last zero is first + count - 1,
+so the lists of corrected zeros are left out. Files of differences or
+GUE tables are skipped by their names (SKIP), and tables relative to a
+base are not found by the scan; they are added with `Catalog.add`.
+
+The catalog is saved in the cache directory of `cache`, in a file named
+after the data directory (see `index_path`), and a table is only
+scanned again if its size or date change. A query for the zeros n1..n2
+with at least k digits takes every part of the range from the best
+table (most digits, then the names in PREFERRED, then the longest part)
+and reads only those rows, through `tables.Table`. The parts no table
+covers are computed by `zeros.goodzero`, as long as double precision
+gives the k digits.
+
+"""
+
+import os
+import re
+import hashlib
+import decimal
+
+import numpy
+from mpmath import mpf
+
+import zeros
+import tables
+import packed
+import counting
+import cache
+
+
+DATA = os.environ.get('RIEMANN_DATA',
+                      os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   os.pardir, 'data'))
+EXTENSIONS = ('.txt', '.dat', '.npy', '.bin', '.rzt')
+SKIP = re.compile(r'diff|gue|prime|question|res$')
+# among tables with the same digits, the checked ones
+PREFERRED = re.compile(r'final|true')
+HEADER = '# source\tfirst\tcount\tdigits\tbase\tsize\tmtime\n'
+
+class Source:
+    """A table of the catalog."""
+
+    def __init__(self, source, first, count, digits, base=0.0, size=0,
+                 mtime=0):
+        self.source = source
+        self.first = int(first)
+        self.count = int(count)
+        self.digits = int(digits)
+        self.base = float(base)
+        self.size = int(size)
+        self.mtime = int(mtime)
+        self.last = self.first + self.count - 1
+        self._table = None
+
+    def table(self, directory):
+        if self._table is None:
+            self._table = tables.Table(os.path.join(directory, self.source))
+        return self._table
+
+    def record(self):
+        return '%s\t%i\t%i\t%i\t%r\t%i\t%i\n' % (self.source, self.first,
+               self.count, self.digits, self.base, self.size, self.mtime)
+
+def _candidate(filename, lines=5):
+    """The first rows of `filename` if it looks like a table of zeros,
+    increasing heights one per line, otherwise None.
+
+    """
+    if filename.endswith(('.npy', '.bin', '.rzt')):
+        table = tables.Table(filename)
+        rows = table.text(0, min(lines, len(table)))
+    else:
+        table = None
+        rows = []
+        for l in open(filename):
+            if len(rows) == lines:
+                break
+            rows.append(l.split()[0] if len(l.split()) == 1 else '')
+    try:
+        values = [float(r) for r in rows]
+    except ValueError:
+        return None
+    if len(values) < 2 or values[0] < 14 or '.' not in rows[0] or \
+       [a for a, b in zip(values, values[1:]) if b <= a]:
+        return None
+    return table or tables.Table(filename)
+
+def scan_file(directory, source):
+    """The Source of the file, or None if it is not a table of
+    contiguous zeros.
+
+    """
+    filename = os.path.join(directory, source)
+    table = _candidate(filename)
+    if table is None:
+        return None
+    first_row, last_row = table.text(0, 1)[0], table.text(len(table)-1)[0]
+    first = counting.count(mpf(first_row) - mpf(10)**(-5)) + 1
+    last = counting.count(mpf(last_row) - mpf(10)**(-5)) + 1
+    if last - first + 1 != len(table):
+        return None
+    stat = os.stat(filename)
+    return Source(source, first, len(table), tables.table_digits(table),
+                  0.0, stat.st_size, stat.st_mtime)
+
+def index_path(directory):
+    """The file where the catalog of `directory` is saved."""
+    h = hashlib.sha1(os.path.abspath(directory)).hexdigest()[:16]
+    return os.path.join(cache.CACHE_DIR, 'catalog_%s.idx' % h)
+
+class Catalog:
+    """The tables of zeros in `directory`."""
+
+    def __init__(self, directory=DATA, refresh=False):
+        self.directory = directory
+        self.sources = []
+        self.skipped = []
+        self.scan(refresh)
+
+    def _load(self):
+        known = {}
+        index = index_path(self.directory)
+        if os.path.exists(index):
+            for l in open(index):
+                if l.strip() and not l.startswith('#'):
+                    s = Source(*l.rstrip('\n').split('\t'))
+                    known[s.source] = s
+        return known
+
+    def save(self):
+        if not os.path.isdir(cache.CACHE_DIR):
+            os.makedirs(cache.CACHE_DIR)
+        out = open(index_path(self.directory), 'w')
+        out.write(HEADER)
+        for s in self.sources + self.skipped:
+            out.write(s.record())
+        out.close()
+
+    def scan(self, refresh=False):
+        """Find the tables, scanning only the new or changed files."""
+        known = self._load()
+        # the tables added by hand are kept
+        self.sources = [s for s in known.values() if s.base]
+        added = set([s.source for s in self.sources])
+        self.skipped = []
+        if refresh:
+            known = {}
+        for root, dirs, files in os.walk(self.directory):
+            dirs.sort()
+            for name in sorted(files):
+                if not name.endswith(EXTENSIONS) or SKIP.search(name):
+                    continue
+                source = os.path.relpath(os.path.join(root, name),
+                                         self.directory)
+                if source in added:
+                    continue
+                stat = os.stat(os.path.join(root, name))
+                s = known.get(source)
+                if s and not s.base and s.size == stat.st_size and \
+                   s.mtime == int(stat.st_mtime):
+                    (self.sources if s.count else self.skipped).append(s)
+                    continue
+                s = scan_file(self.directory, source)
+                if s is None:
+                    # remembered as not a table, so it is not read again
+                    s = Source(source, 0, 0, 0, 0.0, stat.st_size,
+                               stat.st_mtime)
+                (self.sources if s.count else self.skipped).append(s)
+        self.save()
+
+    def add(self, filename, first, base=0.0, digits=0):
+        """Add a table whose first zero has index `first`, with `base`
+        added to each row, e.g. zeros_1012/zeros3.txt with first
+        10^12 + 1 and base 267653395647.
+
+        """
+        source = os.path.relpath(filename, self.directory)
+        table = tables.Table(os.path.join(self.directory, source))
+        if not digits:
+            digits = tables.table_digits(table)
+        self.sources = [s for s in self.sources if s.source != source]
+        self.skipped = [s for s in self.skipped if s.source != source]
+        self.sources.append(Source(source, first, len(table), digits, base,
+                                   os.path.getsize(filename)))
+        self.save()
+
+    def plan(self, n1, n2, digits=0):
+        """Split n1..n2 in parts (source, a, b), the zeros a..b read from
+        `source`, or computed if it is None.
+
+        """
+        good = [s for s in self.sources if s.digits >= digits]
+        parts = []
+        n = n1
+        while n <= n2:
+            covering = [s for s in good if s.first <= n <= s.last]
+            if covering:
+                best = max(covering, key=lambda s: (s.digits,
+                           bool(PREFERRED.search(s.source)), s.last))
+                b = min(best.last, n2)
+            else:
+                best = None
+                after = [s.first for s in good if s.first > n]
+                b = min(after + [n2 + 1]) - 1
+            parts.append((best, n, b))
+            n = b + 1
+        return parts
+
+    def _solve(self, a, b, digits):
+        """The zeros a..b by `zeros.goodzero`. The ones it could not
+        solve (marked ' ?', ' *' or failed) are not good to `digits`, so
+        we raise ValueError with their indexes.
+
+        """
+        if digits > tables.double_digits(zeros.zerow(b)):
+            raise ValueError('no table has the zeros %i..%i with %i '
+                             'digits' % (a, b, digits))
+        values = []
+        bad = []
+        for i in range(a, b+1):
+            y, mark = zeros.goodzero(i)
+            if mark != '':
+                bad.append(i)
+            values.append(y)
+        if bad:
+            raise ValueError('the zeros %s are not in the tables and '
+                             'could not be solved' %
+                             ', '.join([str(i) for i in bad]))
+        return values
+
+    def heights(self, n1, n2, digits=0):
+        """The zeros n1..n2 as a float64 array."""
+        values = []
+        for s, a, b in self.plan(n1, n2, digits):
+            if s is None:
+                values.append(numpy.array(self._solve(a, b, digits),
+                                          dtype=numpy.float64))
+            else:
+                table = s.table(self.directory)
+                values.append(s.base + table.read(a - s.first,
+                                                  b - s.first + 1))
+        return numpy.concatenate(values)
+
+    def rows(self, n1, n2, digits=0):
+        """The zeros n1..n2 as strings, with the digits of the tables."""
+        rows = []
+        for s, a, b in self.plan(n1, n2, digits):
+            if s is None:
+                rows += ['%.20f' % y for y in self._solve(a, b, digits)]
+                continue
+            text = s.table(self.directory).text(a - s.first, b - s.first + 1)
+            if s.base:
+                base = decimal.Decimal(repr(s.base))
+                text = [str(packed.CONTEXT.add(base, decimal.Decimal(r)))
+                        for r in text]
+            rows += text
+        return rows
+
+def zeros_range(n1, n2, digits=0, directory=DATA):
+    """The zeros n1..n2 with at least `digits` decimal places."""
+    return Catalog(directory).heights(n1, n2, digits)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+
+"""
+Certified zeros: an interval around each zero with a proof that it
+holds exactly one zero of Z(t).
+
+A zero from brentq in `zeros.findzero*` is only a sign change of a
+floating point function, so it says nothing about other zeros nearby,
+and the tables in final_zeros_109 had to be corrected several times.
+Here we start from the fast solution y and prove it with the interval
+Newton step
+
+    N(I) = c - Z(c)/Z'(I),    c the middle of I = [y - r, y + r].
+
+If Z'(I) does not contain 0 and N(I) is inside I, then I has exactly
+one zero, and it is in N(I). Repeating I = N(I) & I shrinks the interval
+until its width is below 10^-digits.
+
+Z(t) is enclosed with mpmath `iv` without trusting zeta or loggamma:
+
+    zeta(s)    Euler-Maclaurin with N ~ t/4 terms (more for small t, so
+               the terms reach the precision), and the remainder
+               bound |R_m| <= |s+2m+1|/(sigma+2m+1) |T_{m+1}(s)|
+               (Edwards, Riemann's zeta function, 6.4)
+    theta(t)   Stirling series of log Gamma(1/4 + it/2), shifted by the
+               recurrence when t is small, with the remainder bound
+               |B_{2m+2}| sec^{2m+2}(arg z/2)/((2m+1)(2m+2)|z|^{2m+1}),
+               where sec^2(arg z/2) < 2 since Re z > 0.
+
+The derivatives of both remainders are bounded by Cauchy's estimate on
+a disc around s. The main sum costs t/4 interval terms, so Z'(I) is
+evaluated once at low precision and only Z(c) at full precision: a few
+seconds per zero around 10^5. At the heights of final_zeros_109 the sum
+has 10^8 terms and this is not practical.
+
+"""
+
+from mpmath import mp, mpf, iv, bernfrac, factorial
+import multiprocessing
+
+import check
+import tables
+import zeros
+
+
+# disc of Cauchy's estimate for the remainder of zeta and of log Gamma
+RHO_ZETA = 0.25
+RHO_GAMMA = 0.125
+
+_terms = {}
+
+def _sums(N):
+    """log n and 1/sqrt(n) for n < N, as intervals at the current
+    precision.
+
+    """
+    if iv.prec not in _terms:
+        _terms.clear()
+        _terms[iv.prec] = ([], [])
+    logs, roots = _terms[iv.prec]
+    for n in range(len(logs) + 1, N):
+        logs.append(iv.log(n))
+        roots.append(1/iv.sqrt(n))
+    return logs, roots
+
+def _bernoulli(k):
+    """B_k/k! as an interval."""
+    p, q = bernfrac(k)
+    return iv.mpf(p)/(q*factorial(k))
+
+def _lower(x):
+    return mp.make_mpf(iv.mpf(x)._mpi_[0])
+
+def _upper(x):
+    return mp.make_mpf(iv.mpf(x)._mpi_[1])
+
+def _pm(b):
+    """The interval [-b, b]."""
+    return iv.mpf([-b, b])
+
+def _loggamma(z, eps):
+    """Enclosures of log Gamma(z) and its derivative, for Re z > 0.
+
+    """
+    shift = max(0, int(iv.dps - _lower(abs(z))))
+    w = z + shift
+    main = (w - 0.5)*iv.log(w) - w + iv.log(2*iv.pi)/2
+    deriv = iv.log(w) - 1/(2*w)
+    m = 0
+    wk = w
+    while True:
+        m += 1
+        b = _bernoulli(2*m)*factorial(2*m - 2)
+        main += b/wk
+        deriv -= b*(2*m - 1)/(wk*w)
+        wk *= w*w
+        b = abs(_bernoulli(2*m + 2))*factorial(2*m)*2**(m + 1)
+        bound = _upper(b/abs(w)**(2*m + 1))
+        if bound < eps or m > 200:
+            break
+    dbound = _upper(b/(abs(w) - RHO_GAMMA)**(2*m + 1)/RHO_GAMMA)
+    for j in range(shift):
+        main -= iv.log(z + j)
+        deriv -= 1/(z + j)
+    return main, bound, deriv, dbound
+
+def theta(t, eps):
+    """Enclosures of theta(t) and theta'(t)."""
+    main, bound, deriv, dbound = _loggamma(iv.mpc(0.25, t/2), eps)
+    th = main.imag - t*iv.log(iv.pi)/2 + _pm(bound)
+    dth = deriv.real/2 - iv.log(iv.pi)/2 + _pm(dbound/2)
+    return th, dth
+
+def _em_terms(s, N, eps):
+    """The Euler-Maclaurin terms of zeta(s) after the sum of n^-s,
+    n < N, and their derivative in s, with the number m of Bernoulli
+    terms used and the bound of the remainder.
+
+    """
+    logN = iv.log(N)
+    Ns = iv.exp(-s*logN)
+    tail = N*Ns/(s - 1) + Ns/2
+    dtail = -logN*N*Ns/(s - 1) - N*Ns/(s - 1)**2 - logN*Ns/2
+    product = s
+    inverses = 1/s
+    power = Ns/N
+    m = 0
+    while True:
+        m += 1
+        T = _bernoulli(2*m)*product*power
+        tail += T
+        dtail += T*(inverses - logN)
+        product *= (s + 2*m - 1)*(s + 2*m)
+        inverses += 1/(s + 2*m - 1) + 1/(s + 2*m)
+        power /= N*N
+        T = abs(_bernoulli(2*m + 2)*product*power*(s + 2*m + 1))
+        bound = _upper(T/(s.real + 2*m + 1))
+        if bound < eps or m > 500:
+            return tail, dtail, m, bound
+
+def _em_bound(s, N, m):
+    """Bound of the remainder of Euler-Maclaurin with m terms, for s in
+    a complex interval.
+
+    """
+    product = s
+    for j in range(1, 2*m + 2):
+        product *= s + j
+    sigma = s.real
+    T = abs(_bernoulli(2*m + 2)*product)/iv.exp((sigma + 2*m + 1)*iv.log(N))
+    return _upper(T/(sigma + 2*m + 1))
+
+def enclose(t, derivative=False, eps=None):
+    """Enclosure of Z(t), or of Z'(t) if `derivative`, for an interval
+    (or a number) t > 10. `eps` bounds the truncation errors, by default
+    the precision of iv.
+
+    """
+    t = iv.mpf(t)
+    eps = eps or mpf(2)**(-iv.prec)
+    N = max(int(_upper(t)/4), iv.dps) + 10
+    s = iv.mpc(0.5, t)
+    th, dth = theta(t, eps)
+    logs, roots = _sums(N)
+    total = iv.mpf(0)
+    for n in range(N - 1):
+        x = th - t*logs[n]
+        if derivative:
+            total -= roots[n]*iv.sin(x)*(dth - logs[n])
+        else:
+            total += roots[n]*iv.cos(x)
+    tail, dtail, m, bound = _em_terms(s, N, eps)
+    e = iv.mpc(iv.cos(th), iv.sin(th))
+    if not derivative:
+        return total + (e*tail).real + _pm(bound)
+    box = iv.mpc([0.5 - RHO_ZETA, 0.5 + RHO_ZETA],
+                 [_lower(t) - RHO_ZETA, _upper(t) + RHO_ZETA])
+    dbound = _em_bound(box, N, m)/RHO_ZETA
+    i = iv.mpc(0, 1)
+    return total + (e*(i*dth*tail + i*dtail)).real + \
+           _pm(_upper(abs(dth)*bound) + dbound)
+
+def certify(y, digits=10, radius=1e-6):
+    """Interval (a, b) holding exactly one zero of Z(t), normally with
+    b - a < 10^-digits, found from the approximation `y` (a string keeps
+    all its digits) and the first interval y +- radius. None if it can't be
+    proven: y is too far, or there is another zero within `radius`.
+    mp.dps and iv.dps are restored on return.
+
+    """
+    old = mp.dps, iv.dps
+    try:
+        return _certify(y, digits, radius)
+    finally:
+        mp.dps, iv.dps = old
+
+def _certify(y, digits, radius):
+    height = len(str(int(float(y))))
+    mp.dps = iv.dps = digits + 2*height + 10
+    c = mpf(y)
+    I = iv.mpf([c - radius, c + radius])
+    iv.dps = height + 10
+    D = enclose(I, derivative=True)
+    if 0 in D:
+        return None
+    iv.dps = mp.dps
+    D = iv.mpf([_lower(D), _upper(D)])
+    a, b = _lower(I), _upper(I)
+    for step in range(50):
+        c = (a + b)/2
+        N = iv.mpf(c) - enclose(c)/D
+        if step == 0 and not (a < _lower(N) and _upper(N) < b):
+            return None
+        width = b - a
+        a, b = max(_lower(N), a), min(_upper(N), b)
+        if b - a < mpf(10)**(-digits) or b - a > width/2:
+            break
+    return a, b
+
+def decimal(x, places, up=False):
+    """x with `places` decimals, rounded down, or up if `up`, so the
+    printed interval still holds the zero.
+
+    """
+    man, exp = x.man_exp
+    n = man*10**places
+    if exp >= 0:
+        n <<= exp
+    else:
+        n = -((-n) >> -exp) if up else n >> -exp
+    s = str(abs(n)).rjust(places + 1, '0')
+    return ('-' if n < 0 else '') + s[:-places] + '.' + s[-places:]
+
+def certified_zero(n, digits=10):
+    """The n-th zero by `zeros.goodzero`, and its certified interval."""
+    y, mark = zeros.goodzero(n)
+    return y, certify('%.20f' % y, digits)
+
+def certify_chunk(args):
+    """Certify a chunk of consecutive zeros. Used by the pool."""
+    first, values, digits, radius = args
+    return [(first + i, y, certify(y, digits, radius))
+            for i, y in enumerate(values)]
+
+def certify_table(filename, output, first_index=1, digits=0, processes=None,
+                  chunksize=20, radius=1e-6, verbose=True):
+    """Certify the table `filename`, whose first zero has index
+    `first_index`, and write the index and the interval of each zero to
+    `output`. If `digits` is not given it is guessed from the table.
+    Return the list of (n, y) of the zeros that could not be certified.
+
+    """
+    values = check.read_table(filename)
+    if not digits:
+        digits = tables.table_digits(values)
+    chunks = [(first_index + i, values[i:i+chunksize], digits, radius)
+              for i in range(0, len(values), chunksize)]
+    pool = multiprocessing.Pool(processes)
+    out = open(output, 'w')
+    bad = []
+    done = 0
+    for result in pool.imap(certify_chunk, chunks):
+        for n, y, interval in result:
+            if interval is None:
+                bad.append((n, y))
+                continue
+            a, b = interval
+            out.write('%i\t%s\t%s\n' % (n, decimal(a, digits + 2),
+                                        decimal(b, digits + 2, up=True)))
+        done += len(result)
+        if verbose:
+            print 'checked %i of %i, %i not certified' % (done, len(values),
+                                                           len(bad))
+    out.close()
+    pool.close()
+    pool.join()
+    return bad
@@ -1,15 +1,126 @@
-#!/usr/bin/env python 
+#!/usr/bin/env python
+
+"""
+Verify a table of zeros. For each zero y_n we evaluate the
+transcendental equation slightly off the critical line,
+
+    transeqe(n, s, y_n),
+
+which is close to zero when y_n agrees with the true zero up to about
+`s`, and jumps to about 1/2 otherwise. We also check that Z(t) changes
+sign around y_n, which certifies that there is a zero in the interval.
+At the close pairs the principal argument makes the equation off by
++-1 (that is why `zeros.transeqd` exists), so there a residual close to
++-1 is also good, as long as Z changes sign.
+
+The table is split in chunks solved by a pool of processes, and each
+zero is computed with the minimum precision needed at its height.
+
+"""
 
 from mpmath import *
 import zeros
-import sys
+import tables
+import multiprocessing
+import numpy
+
+
+def read_table(filename):
+    """Return the zeros in `filename` as strings, so we don't loose the
+    digits of high precision tables. Files ending in .npy are read by
+    numpy, other binary files (.bin) are raw float64. Text files may
+    have more columns, we only take the first one.
+
+    """
+    if filename.endswith('.npy'):
+        return [repr(float(x)) for x in numpy.load(filename)]
+    if filename.endswith('.bin'):
+        return [repr(float(x)) for x in numpy.fromfile(filename, '<f8')]
+    values = []
+    for l in open(filename):
+        cols = l.split()
+        if cols:
+            values.append(cols[0])
+    return values
+
+def check_zero(n, y, digits, gap):
+    """Return (residual, sign change) for the zero `y` of index `n`.
+    The precision is just enough to resolve 10^-digits at height y.
+
+    """
+    mp.dps = len(str(int(float(y)))) + digits + 5
+    y = mpf(y)
+    s = power(10, -digits)
+    res = zeros.transeqe(n, s, y)
+    delta = min(s, mpf(gap)/4)
+    sign = siegelz(y - delta)*siegelz(y + delta) < 0
+    return float(res), sign
+
+def good(res, sign, tolerance):
+    """True if the zero with residual `res` and `sign` change is good."""
+    return sign and min([abs(res - d) for d in (-1, 0, 1)]) <= tolerance
+
+def check_chunk(args):
+    """Check a chunk of consecutive zeros. Used by the pool."""
+    first, values, digits, before, after = args
+    ys = [before] + values + [after]
+    result = []
+    for i, y in enumerate(values):
+        gaps = [abs(float(ys[i+1]) - float(ys[i])),
+                abs(float(ys[i+2]) - float(ys[i+1]))]
+        gap = min([g for g in gaps if g > 0] or [1.0])
+        res, sign = check_zero(first+i, y, digits, gap)
+        result.append((first+i, res, sign))
+    return result
+
+def verify(filename, first_index=1, digits=0, processes=None, chunksize=500,
+           tolerance=0.25, verbose=True):
+    """Verify the table `filename`, whose first zero has index
+    `first_index`. If `digits` is not given it is guessed from the
+    table. Return the list of (n, residual, sign change) of the bad
+    zeros, i.e. no sign change, or a residual farther than `tolerance`
+    from 0 and +-1 (see `good`).
+
+    """
+    values = read_table(filename)
+    if not digits:
+        digits = tables.table_digits(values)
+    chunks = []
+    for i in range(0, len(values), chunksize):
+        before = values[i-1] if i > 0 else values[i]
+        after = values[i+chunksize] if i+chunksize < len(values) \
+                else values[-1]
+        chunks.append((first_index+i, values[i:i+chunksize], digits,
+                       before, after))
+    pool = multiprocessing.Pool(processes)
+    bad = []
+    done = 0
+    for result in pool.imap(check_chunk, chunks):
+        for n, res, sign in result:
+            if not good(res, sign, tolerance):
+                bad.append((n, res, sign))
+        done += len(result)
+        if verbose:
+            print 'checked %i of %i, %i bad' % (done, len(values), len(bad))
+    pool.close()
+    pool.join()
+    return bad
 
+def write_bad(bad, output):
+    """Write the indexes of the bad zeros, one per line, like the
+    diff files used by `zeros.replace_badones` and `genzeros.py -s`.
 
-mp.dps = 200
-#pretty = True
+    """
+    o = open(output, 'w')
+    for n, res, sign in bad:
+        o.write('%i\n' % n)
+    o.close()
 
-zeta_zeros = [zetazero(n).imag for n in range(1, 100+1)]
+if __name__ == '__main__':
+    mp.dps = 200
+    #pretty = True
 
-for n, zz in enumerate(zeta_zeros):
-    print '%.10f' % zeros.transeqe(n+1, power(10, -8), zz)
+    zeta_zeros = [zetazero(n).imag for n in range(1, 100+1)]
 
+    for n, zz in enumerate(zeta_zeros):
+        print '%.10f' % zeros.transeqe(n+1, power(10, -8), zz)
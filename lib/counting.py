@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+"""
+Riemann's zero counting function and the map between the index of a
+zero and its height on the critical line.
+
+The number of zeros with 0 < t <= T is
+
+    N(T) = theta(T)/pi + 1 + S(T),   S(T) = arg zeta(1/2+iT)/pi,
+
+where theta is Riemann-Siegel theta. We cache S(T), so counting the same
+heights again is free, and N(T) + 1 is the index of the first zero above
+T. For batches of millions of heights we use a table of zeros and a
+binary search, which is exact and needs no zeta evaluation at all; the
+smooth part theta(T)/pi + 1 alone is also vectorized.
+
+Note that we use the principal value of arg, as in the transcendental
+equation, so this is correct as long as |S(T)| < 1.
+
+"""
+
+from mpmath import *
+import numpy
+
+
+_S = {}
+
+def s_function(t):
+    """S(T) = arg zeta(1/2+iT)/pi, cached."""
+    key = (str(t), mp.dps)
+    if key not in _S:
+        _S[key] = arg(zeta(mpc(0.5, t)))/pi
+    return _S[key]
+
+def count(t):
+    """N(T), the number of zeros with imaginary part in (0, T]."""
+    if t < 14:
+        return 0
+    return int(nint(siegeltheta(t)/pi + 1 + s_function(t)))
+
+# coefficients of t^(1-2k) in the Stirling series of theta,
+# (1 - 2^(1-2k)) |B_2k|/(4k(2k-1)), k = 1..7
+THETA_SERIES = [1.0/48, 7.0/5760, 31.0/80640, 127.0/430080,
+                511.0/1216512, 1414477.0/1476034560, 8191.0/2555904]
+
+def theta_array(t):
+    """Riemann-Siegel theta for an array of heights, through the
+    Stirling series. It has double precision for t >= 10, where the
+    first term left out is below 10^-17.
+
+    """
+    t = numpy.asarray(t, dtype=numpy.float64)
+    u = 1.0/(t*t)
+    series = 0.0
+    for c in reversed(THETA_SERIES):
+        series = series*u + c
+    return t/2.0*numpy.log(t/2.0/numpy.pi) - t/2.0 - numpy.pi/8.0 + series/t
+
+def count_smooth(t):
+    """theta(T)/pi + 1 for an array of heights, i.e. N(T) without S(T)."""
+    return theta_array(t)/numpy.pi + 1.0
+
+def index_above(t):
+    """Index of the first zero above the height `t`."""
+    return count(t) + 1
+
+def first_index(filename):
+    """Index of the first zero of a table, found from its height."""
+    for l in open(filename):
+        if l.split():
+            y = mpf(l.split()[0])
+            break
+    # just below the zero, where arg zeta is well defined
+    return count(y - mpf(10)**(-5)) + 1
+
+class ZeroIndex:
+    """Map between indexes and heights based on a table of zeros,
+    one per line, whose first zero has index `first`. If `first` is 0
+    it is found from the height of the first zero.
+
+    Every query accepts a number or an array and is a binary search on
+    the table, so millions of queries cost no zeta evaluation.
+
+    """
+
+    def __init__(self, filename, first=0):
+        self.filename = filename
+        self.first = first or first_index(filename)
+        self.heights = numpy.array([float(l.split()[0])
+                                    for l in open(filename) if l.split()])
+        self.last = self.first + len(self.heights) - 1
+
+    def count(self, t):
+        """N(T) for heights inside the table."""
+        return self.first - 1 + numpy.searchsorted(self.heights, t,
+                                                   side='right')
+
+    def index_above(self, t):
+        """Index of the first zero above `t`."""
+        return self.count(t) + 1
+
+    def height(self, n):
+        """Height of the zeros with index `n`."""
+        n = numpy.asarray(n)
+        if n.size and (n.min() < self.first or n.max() > self.last):
+            raise IndexError('the table has the zeros %i..%i' %
+                             (self.first, self.last))
+        return self.heights[n - self.first]
+
+    def window(self, t1, t2):
+        """Indexes (m, n) of the first and the last zero in [t1, t2]."""
+        m = self.first + numpy.searchsorted(self.heights, t1, side='left')
+        return int(m), int(self.count(t2))
+
+def window(t1, t2, filename='', first=0):
+    """Indexes (m, n) of the first and the last zero in [t1, t2],
+    from the table `filename` if given, otherwise from N(T).
+
+    """
+    if filename:
+        return ZeroIndex(filename, first).window(t1, t2)
+    return index_above(t1), count(t2)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+
+"""
+Pair correlation and form factor of the unfolded zeros through FFT.
+
+Counting the pairs bin by bin, as in `gue1` and `gue2`, is fine for
+10^5 zeros but not for 10^7. Here the unfolded zeros (see `unfold`) are
+put on a grid of cells of width dx, so the density is a sequence of
+counts rho_j, and
+
+    two point function   R2(k dx) = sum_j rho_j rho_{j+k} / (N dx),
+
+whose prediction is Montgomery's 1 - (sin pi x/pi x)^2, and
+
+    form factor   K(tau) = |sum_n e^{2 pi i tau x_n}|^2 / N,
+
+its Fourier dual, whose GUE prediction is min(|tau|, 1). Both are
+computed with FFTs in segments, so the memory does not depend on the
+number of zeros and the cost is O(N log N). A window (hann, blackman,
+bartlett) can be applied to reduce the edge effects.
+
+The tables have the same three columns as the ones of `gue.py`, so
+`guegraph.py` can plot them.
+
+"""
+
+import numpy
+
+import unfold
+
+
+# windows as functions of u in [0, 1]
+WINDOWS = {
+    'none': lambda u: numpy.ones_like(u),
+    'hann': lambda u: 0.5 - 0.5*numpy.cos(2*numpy.pi*u),
+    'blackman': lambda u: 0.42 - 0.5*numpy.cos(2*numpy.pi*u) + \
+                          0.08*numpy.cos(4*numpy.pi*u),
+    'bartlett': lambda u: 1.0 - numpy.abs(2.0*u - 1.0),
+}
+
+def _cells(x, start, size, dx):
+    """Counts of the zeros in `size` cells of width dx from `start`."""
+    i, j = numpy.searchsorted(x, [start, start + size*dx])
+    k = ((x[i:j] - start)/dx).astype(numpy.int64)
+    return numpy.bincount(numpy.minimum(k, size-1), minlength=size)
+
+def _nfft(n):
+    return 1 << int(numpy.ceil(numpy.log2(n)))
+
+def correlation(x, maxlag, dx, window='none', block=1 << 18):
+    """Return sum_j rho_j rho_{j+k} and sum_j w_j w_{j+k}, for
+    k = 0..maxlag, where w is the window over all the cells, and
+    sum_j w_j^2 rho_j, the part of the lag 0 made by each zero with
+    itself. The sums are made in blocks of `block` cells.
+
+    """
+    x = numpy.asarray(x, dtype=numpy.float64) - x[0]
+    total = int(numpy.ceil(x[-1]/dx)) + 1
+    w = WINDOWS[window]
+    n = _nfft(block + maxlag)
+    c = numpy.zeros(maxlag+1)
+    a = numpy.zeros(maxlag+1)
+    self_pairs = 0.0
+    for start in range(0, total, block):
+        size = min(block + maxlag, total - start)
+        u = (start + numpy.arange(size))/float(total)
+        wb = w(u)
+        counts = _cells(x, start*dx, size, dx)
+        rho = counts*wb
+        head = min(block, size)
+        self_pairs += (wb[:head]**2*counts[:head]).sum()
+        pairs = [(rho, c)]
+        if window != 'none':
+            pairs.append((wb, a))
+        for seq, acc in pairs:
+            f = numpy.fft.rfft(seq[:head], n)
+            g = numpy.fft.rfft(seq, n)
+            r = numpy.fft.irfft(numpy.conj(f)*g, n)[:maxlag+1]
+            acc[:len(r)] += r
+    if window == 'none':
+        a = numpy.maximum(total - numpy.arange(maxlag+1), 0).astype(float)
+    return c, a, self_pairs
+
+def _triangle(u):
+    """Distribution of the distance, in cells, of two points whose
+    cells are at distance 0: the difference of two uniform variables.
+
+    """
+    u = numpy.clip(u, -1.0, 1.0)
+    return numpy.where(u < 0, (u + 1)**2/2.0, 1.0 - (1 - u)**2/2.0)
+
+def _overlap(lags, lo, hi):
+    """Probability that a pair of cells at distance `lags` is at a
+    distance in [lo, hi), in cells. Pairs in the same cell have the
+    distance |u| of the triangle.
+
+    """
+    p = _triangle(hi - lags) - _triangle(lo - lags)
+    p[0] = 2*(_triangle(numpy.array(hi)) - _triangle(numpy.array(max(lo, 0))))
+    return p
+
+def two_point(x, alpha, step, dx=0.0, window='none'):
+    """R2 averaged on the bins [a, a+step) for a from alpha[0] to
+    alpha[1]. Return the arrays of centers and values.
+
+    """
+    if not dx:
+        dx = step/10.0
+    alphas = numpy.arange(alpha[0], alpha[1], step)
+    maxlag = int(numpy.ceil((alphas[-1] + step)/dx)) + 1
+    c, a, self_pairs = correlation(x, maxlag, dx, window)
+    # the pairs j > i inside a cell, and what we would have if the
+    # zeros were independent with density 1
+    c[0] = (c[0] - self_pairs)/2.0
+    expected = a*dx*dx
+    expected[0] /= 2.0
+    lags = numpy.arange(maxlag+1)
+    values = []
+    for lo in alphas:
+        p = _overlap(lags, lo/dx, (lo + step)/dx)
+        values.append((p*c).sum()/(p*expected).sum())
+    return alphas + step/2.0, numpy.array(values)
+
+def form_factor(x, tau, step, dx=0.01, window='hann', segment=1 << 16):
+    """K averaged on the bins [t, t+step) for t from tau[0] to tau[1].
+    The spectrum is averaged over half overlapping segments of
+    `segment` cells (Welch), so the resolution in tau is 1/(segment dx).
+    Return the arrays of centers and values.
+
+    """
+    x = numpy.asarray(x, dtype=numpy.float64) - x[0]
+    total = int(numpy.ceil(x[-1]/dx)) + 1
+    segment = min(segment, _nfft(total))
+    w = WINDOWS[window]((numpy.arange(segment) + 0.5)/segment)
+    power = numpy.zeros(segment/2 + 1)
+    norm = 0.0
+    for start in range(0, max(total - segment, 0) + 1, segment/2):
+        rho = _cells(x, start*dx, segment, dx).astype(numpy.float64)
+        if not rho.any():
+            continue
+        power += numpy.abs(numpy.fft.rfft((rho - rho.mean())*w))**2
+        norm += (w*w*rho).sum()
+    taus = numpy.arange(len(power))/(segment*dx)
+    # putting the zeros in cells multiplies the spectrum by sinc^2
+    power /= norm*numpy.sinc(taus*dx)**2
+    starts = numpy.arange(tau[0], tau[1], step)
+    values = []
+    for lo in starts:
+        k = (taus >= lo) & (taus < lo + step)
+        values.append(power[k].mean())
+    return starts + step/2.0, numpy.array(values)
+
+def gue_two_point(a, b, points=200):
+    """Bin average of 1 - (sin pi x/pi x)^2."""
+    x = numpy.linspace(a, b, points)
+    return (1.0 - numpy.sinc(x)**2).mean()
+
+def gue_form_factor(a, b, points=200):
+    """Bin average of min(|tau|, 1)."""
+    t = numpy.linspace(a, b, points)
+    return numpy.minimum(numpy.abs(t), 1.0).mean()
+
+def write_table(filename, centers, values, theory):
+    out = open(filename, 'w')
+    for row in zip(centers, values, theory):
+        out.write('%.4f\t%.10f\t%.10f\n' % row)
+    out.close()
+
+def main(unfolded, output_file, kind='r2', alpha=(0.0, 1.95), step=0.05,
+         dx=0.0, window=''):
+    """Write the table of R2 (kind 'r2') or K (kind 'k') for the
+    unfolded zeros, a .npy file of `unfold.save` or an array.
+
+    """
+    if isinstance(unfolded, str):
+        unfolded = unfold.load(unfolded)
+    if kind == 'r2':
+        centers, values = two_point(unfolded, alpha, step, dx,
+                                    window or 'none')
+        theory = [gue_two_point(c - step/2.0, c + step/2.0) for c in centers]
+    elif kind == 'k':
+        centers, values = form_factor(unfolded, alpha, step, dx or 0.01,
+                                      window or 'hann')
+        theory = [gue_form_factor(c - step/2.0, c + step/2.0)
+                  for c in centers]
+    else:
+        raise ValueError('unknown kind %s, use r2 or k' % kind)
+    write_table(output_file, centers, values, theory)
+    return centers, values
@@ -9,21 +9,104 @@ Cornell University, Physics Department
 
 """
 
+import os
+import re
+import glob
+import contextlib
+import multiprocessing
 import matplotlib
 #matplotlib.use('PDF') # in case we run on a remote computer
+# RIEMANN_PLOTS=fast renders without LaTeX and without a display
+PROFILE = os.environ.get('RIEMANN_PLOTS', 'publication')
+if PROFILE == 'fast':
+    matplotlib.use('Agg')
 import functools
 import pylab
 import mpmath
+import numpy
 
 import zeros
+import cache
+import sampling
+import tables
+import sweep
+
+
+# The rendering profiles. 'publication' typesets every text with LaTeX,
+# which is what we want in the papers but takes most of the time of a
+# plot. 'fast' uses matplotlib's mathtext with Computer Modern fonts,
+# and the labels are translated to what mathtext understands when the
+# figure is saved.
+PROFILES = {
+    'publication': {
+        'font.family': 'computer modern roman',
+        'font.serif': 'computer modern sans serif',
+        'text.usetex': True,
+        'text.latex.preamble': [
+            '\usepackage{amsmath,amsfonts,amssymb,relsize,cancel}'],
+    },
+    'fast': {
+        'font.family': 'serif',
+        'font.serif': matplotlib.rcParamsDefault['font.serif'],
+        'text.usetex': False,
+        'mathtext.fontset': 'cm',
+    },
+}
+_profile = [PROFILE]
+
+def use_profile(name, headless=False):
+    """Select the rendering profile for the next figures. With
+    `headless` we also switch to the Agg backend, which needs no display.
 
+    """
+    if name not in PROFILES:
+        raise ValueError('unknown rendering profile %s' % name)
+    pylab.rcParams.update(PROFILES[name])
+    _profile[0] = name
+    if headless:
+        pylab.switch_backend('Agg')
+
+@contextlib.contextmanager
+def rendering(profile=''):
+    """Use the rendering `profile` inside the block, the current one if
+    `profile` is empty.
+
+    """
+    previous = _profile[0]
+    use_profile(profile or previous)
+    try:
+        yield
+    finally:
+        use_profile(previous)
+
+_MATHTEXT = [(re.compile(r'\\[td]frac'), r'\\frac'),
+             (re.compile(r'\\dotsc'), r'\\ldots'),
+             (re.compile(r'\\mbox\{([^}]*)\}'), r'\\mathrm{\1}'),
+             (re.compile(r'\\cancel\{([^}]*)\}'), r'\1')]
+
+def mathtext(label):
+    """Translate the LaTeX of our labels to mathtext."""
+    for pattern, replacement in _MATHTEXT:
+        label = pattern.sub(replacement, label)
+    return label
+
+def savefig(output, **kwargs):
+    """Save the current figure, fixing its labels in the fast profile."""
+    if _profile[0] == 'fast':
+        fig = pylab.gcf()
+        for text in fig.findobj(matplotlib.text.Text):
+            text.set_text(mathtext(text.get_text()))
+        # tick labels are made again from their formatter when drawn
+        for ax in fig.axes:
+            for axis in [ax.xaxis, ax.yaxis]:
+                f = axis.get_major_formatter()
+                if isinstance(f, matplotlib.ticker.FixedFormatter):
+                    f.seq = [mathtext(l) for l in f.seq]
+    pylab.savefig(output, **kwargs)
 
 pylab.rc('lines', linewidth=1, antialiased=True, markeredgewidth=0.1)
-pylab.rc('font', family='computer modern roman', style='normal', 
-         weight='normal', serif='computer modern sans serif', size=10)
-pylab.rc('text', usetex=True)
-pylab.rc('text.latex', preamble=[
-        '\usepackage{amsmath,amsfonts,amssymb,relsize,cancel}'])
+pylab.rc('font', style='normal', weight='normal', size=10)
+use_profile(PROFILE)
 pylab.rc('axes', linewidth=0.5, labelsize=10)
 pylab.rc('xtick', labelsize=10)
 pylab.rc('ytick', labelsize=10)
@@ -31,7 +114,7 @@ pylab.rc('ytick', labelsize=10)
 pylab.rc('legend', numpoints=1, fontsize=12)
 fig_width_pt = 455.0 / 1.5 # take this from LaTeX \textwidth in points
 inches_per_pt = 1.0/72.27
-golden_mean = (mpmath.sqrt(5.0)-1.0)/2.0
+golden_mean = float((mpmath.sqrt(5.0)-1.0)/2.0)
 fig_width = fig_width_pt*inches_per_pt
 fig_height = fig_width*golden_mean
 pylab.rc('figure', figsize=(fig_width, fig_height))
@@ -76,29 +159,30 @@ class Transcendental:
         self.color_partial = 'b'
         self.color_arg = 'g'
         self.color_complete = 'r'
+        self.profile = '' # rendering profile, the current one if empty
         
     def make_graph(self, output):
+        with rendering(self.profile):
+            self._make_graph(output)
+
+    def _make_graph(self, output):
         approx = zeros.zerow(self.n)
-        better = zeros.findzero(self.n)
+        better = cache.value(zeros.findzero, self.n)
         if not self.xmin:
             self.xmin = approx - self.left
-            self.xmax = self.approx + self.right
+            self.xmax = approx + self.right
         if not self.zoom_xmin:
-            self.zoom_xmin = self.approx - self.zoom_left
-            self.zoom_xmax = self.approx + self.zoom_right
+            self.zoom_xmin = approx - self.zoom_left
+            self.zoom_xmax = approx + self.zoom_right
         zoom_position = [self.zoom_x, self.zoom_y, 
                          self.zoom_width, self.zoom_width*golden_mean]
         
-        complete = functools.partial(zeros.transeq, self.n)
-        partial = functools.partial(zeros.transeq_first, self.n)
-        arg = zeros.argzeta
-        
         xvalues = pylab.arange(approx-self.left, 
                                approx+self.right, 
                                self.step)
-        ypartial = [partial(y) for y in xvalues]
-        ycomplete = [complete(y) for y in xvalues]
-        argument = [arg(y) for y in xvalues]
+        ypartial = zeros.transeq_first_array(self.n, xvalues)
+        ycomplete = cache.curve(zeros.transeq, xvalues, self.n)
+        argument = cache.curve(zeros.argzeta, xvalues)
         
         fig = pylab.figure()
         ax = fig.add_subplot(111)
@@ -139,9 +223,9 @@ class Transcendental:
         xvalues = pylab.arange(approx-self.zoom_left, 
                                approx+self.zoom_right, 
                                self.zoom_step)
-        ypartial = [partial(y) for y in xvalues]
-        ycomplete = [complete(y) for y in xvalues]
-        argument = [arg(y) for y in xvalues]
+        ypartial = zeros.transeq_first_array(self.n, xvalues)
+        ycomplete = cache.curve(zeros.transeq, xvalues, self.n)
+        argument = cache.curve(zeros.argzeta, xvalues)
         
         axins = pylab.axes(zoom_position)
         axins.grid(True)
@@ -154,7 +238,7 @@ class Transcendental:
         axins.set_xlim(float(self.zoom_xmin), float(self.zoom_xmax))
         if self.zoom_ymin and self.zoom_ymax:
             axins.yaxis.set_ticks([self.zoom_ymin, 0.0, self.zoom_ymax])
-        pylab.savefig(output, bbox_inches='tight')
+        savefig(output, bbox_inches='tight')
 
 
 class Zeros:
@@ -178,27 +262,27 @@ class Zeros:
         self.zoom_width = 0.4
         self.margin_left = 5
         self.margin_right = 5
+        self.first = 1 # index of the first zero in the file
+        self.max_points = 5000 # of the Lambert curve
+        self.profile = '' # rendering profile, the current one if empty
         
     def make_graph(self, output):
-        xtrans = range(self.m, self.n+1, 1)
-        ytrans = []
-        for i, l in enumerate(open(self.input_file)):
-            if i + 1 < self.m:
-                continue
-            elif i + 1 > self.n:
-                break
-            ytrans.append(mpmath.mpf(l.strip()))
-        xlambert = pylab.arange(self.m-0.4, self.n+1+0.4, 0.2)
-        ylambert = [zeros.zerow(a) for a in xlambert]
+        with rendering(self.profile):
+            self._make_graph(output)
+
+    def _make_graph(self, output):
+        # only the rows which are drawn are read from the file
+        table = tables.Table(self.input_file)
+        xtrans = tables.decimate(self.m, self.n, self.jump)
+        ytrans = table.rows(xtrans - self.first)
+        step = max(0.2, (self.n - self.m)/float(self.max_points))
+        xlambert = pylab.arange(self.m-0.4, self.n+1+0.4, step)
+        ylambert = zeros.zerow_array(xlambert)
         
         fig = pylab.figure()
         ax = fig.add_subplot(111)
         ax.plot(xlambert, ylambert, '-', color='b') 
-        ax.plot([xtrans[i] for i in range(len(xtrans)) 
-                 if (i+1)%self.jump==0 or i==0], 
-                [ytrans[i] for i in range(len(ytrans)) 
-                 if (i+1)%self.jump==0 or i==0], self.symbol, 
-                color='r', markersize=4)
+        ax.plot(xtrans, ytrans, self.symbol, color='r', markersize=4)
         ax.set_title(r'$n=%i \dotsc %i$' % (self.m, self.n))
         #l = ax.legend([r'($20$)', r'($11$)'], loc=0)
         #l.get_frame().set_linewidth(0.1)
@@ -215,9 +299,9 @@ class Zeros:
         ax.grid(True)
         ax.set_axisbelow(True)
         ax.set_xlim(self.m-self.margin_left, self.n+self.margin_right)
-        ax.xaxis.set_ticks(range(self.m, self.n, self.jump_ticks))
-        ypoints = [ytrans[i] 
-                   for i in range(self.m-1, self.n, self.jump_ticks)]
+        xpoints = range(self.m, self.n, self.jump_ticks)
+        ax.xaxis.set_ticks(xpoints)
+        ypoints = table.rows(numpy.array(xpoints) - self.first)
         ax.yaxis.set_ticks(ypoints)
         ax.yaxis.set_ticklabels([r'$%.4f$' % i for i in ypoints])
     
@@ -227,45 +311,41 @@ class Zeros:
         zoom_position = [self.zoom_x, self.zoom_y, 
                          self.zoom_width, zoom_height]
         xlambert = pylab.arange(first-0.2, last+1, 0.5)
-        ylambert = [zeros.zerow(a) for a in xlambert]
+        ylambert = zeros.zerow_array(xlambert)
         xtrans = range(first, last+1, 1)
-        ytrans = ytrans[first-1:last+1]
+        ytrans = table.read(first-self.first, last-self.first+1)
         axins = pylab.axes(zoom_position)
         axins.plot(xlambert, ylambert, '-', color='b')
         axins.plot(xtrans, ytrans, self.symbol, color='r', markersize=4)
         axins.xaxis.set_ticks([])
         axins.yaxis.set_ticks([])
         axins.set_xlim(first-0.2, last+0.2)
-        pylab.savefig(output, bbox_inches='tight')
+        savefig(output, bbox_inches='tight')
 
 
 def lambert_dots(output, input_file, m=1, n=400, jump=25, jump_ticks=45,
-                 symbol='o', margin_left=5, margin_right=2):
+                 symbol='o', margin_left=5, margin_right=2, first=1,
+                 max_points=5000):
     # take points for the transcendental equation solutions
-    # the y values are taken from `input_file`
-    xtrans = range(m, n+1, 1)
-    ytrans = []
-    for i, l in enumerate(open(input_file)):
-        if i + 1 < m:
-            continue
-        elif i + 1 > n:
-            break
-        ytrans.append(mpmath.mpf(l.strip()))
+    # the y values are taken from `input_file`, whose first line is the
+    # zero `first`, and we only read the ones we draw
+    table = tables.Table(input_file)
+    xtrans = tables.decimate(m, n, jump)
+    ytrans = table.rows(xtrans - first)
     
     # take points for lambert approximation
     xmin = m-margin_left
     if xmin < 0:
         xmin = 0.4
     xmax = n+1+margin_right
-    xlambert = pylab.arange(xmin, xmax, 0.2)
-    ylambert = [zeros.zerow(a) for a in xlambert]
+    step = max(0.2, (xmax-xmin)/float(max_points))
+    xlambert = pylab.arange(xmin, xmax, step)
+    ylambert = zeros.zerow_array(xlambert)
    
     fig = pylab.figure()
     ax = fig.add_subplot(111)
     ax.plot(xlambert, ylambert, '-', color='b') 
-    ax.plot([xtrans[i] for i in range(len(xtrans)) if (i+1)%jump==0 or i==0], 
-            [ytrans[i] for i in range(len(ytrans)) if (i+1)%jump==0 or i==0], 
-            symbol, color='r', markersize=4)
+    ax.plot(xtrans, ytrans, symbol, color='r', markersize=4)
     #ax.set_title(r'$n=%i \dotsc %i$' % (self.m, self.n))
     #ax.xaxis.set_ticks_position('bottom')
     #ax.yaxis.set_ticks_position('left')
@@ -275,10 +355,26 @@ def lambert_dots(output, input_file, m=1, n=400, jump=25, jump_ticks=45,
     ax.set_xlim(xmin, xmax-1)
     ax.set_ylim(float(ylambert[0]), float(ylambert[-1]))
     ax.xaxis.set_ticks(range(m, n, jump_ticks))
-    ypoints = [ytrans[i] for i in range(0, n-m, jump_ticks)]
+    ypoints = table.rows(numpy.arange(m, n, jump_ticks) - first)
     ax.yaxis.set_ticks(ypoints)
     ax.yaxis.set_ticklabels([r'$%.3f$' % i for i in ypoints])
-    pylab.savefig(output, bbox_inches='tight')
+    savefig(output, bbox_inches='tight')
+
+def residual_envelope(output, input_file, m=1, n=100000, bins=1000, first=1):
+    """Min/max envelope of y_n - zerow(n) for n = m..n, for ranges with
+    too many zeros to be drawn one by one. The file is streamed.
+
+    """
+    x, low, high = tables.envelope(input_file, m, n, bins, first)
+    fig = pylab.figure()
+    ax = fig.add_subplot(111)
+    pylab.fill_between(x, low, high, color='b', alpha=.30, linewidth=0)
+    ax.plot(x, [0]*len(x), '--', color='k', linewidth=.5)
+    ax.set_xlim(m, n)
+    ax.set_xlabel(r'$n$')
+    ax.set_ylabel(r'$y_n - \tilde{y}_n$')
+    ax.set_title(r'$n=%i \dotsc %i$' % (m, n))
+    savefig(output, bbox_inches='tight')
 
 
 #lambert_dots('lambert_dots.pdf', 
@@ -312,23 +408,31 @@ class Montgomery:
         self.ymax = 0
         self.ymin = 0
         self.loc = 4
-
-    def make_graph(self, output):
-        f = open(self.input_file)
-        values = [[], [], []]
-        for l in f:
-            a = [mpmath.mpf(x) for x in l.strip().split(self.sep)]
-            values[0].append(a[0])
-            values[1].append(a[1])
-            values[2].append(a[2])
-        fig = pylab.figure()
+        self.profile = '' # rendering profile, the current one if empty
+
+    def make_graph(self, output, fig=None):
+        """Save the graph in `output`. If the figure `fig` is given it
+        is cleared and reused, otherwise a new one is made and closed.
+
+        """
+        with rendering(self.profile):
+            if fig is None:
+                fig = pylab.figure()
+                try:
+                    self._make_graph(output, fig)
+                finally:
+                    pylab.close(fig)
+            else:
+                fig.clf()
+                self._make_graph(output, fig)
+
+    def _make_graph(self, output, fig):
+        x, points, gue = gue_table(self.input_file, self.sep)
         ax = fig.add_subplot(111)
-        ax.plot(values[0], values[2], '-', color=self.color_gue,
-                linewidth=self.linewidth)
-        ax.plot(values[0], values[1], self.symbol, color=self.color_points, 
+        ax.plot(x, gue, '-', color=self.color_gue, linewidth=self.linewidth)
+        ax.plot(x, points, self.symbol, color=self.color_points, 
                 markersize=self.markersize)
-        pylab.fill_between(values[0], 0, values[2], color=self.color_gue, 
-                           alpha=.10)
+        ax.fill_between(x, 0, gue, color=self.color_gue, alpha=.10)
         if self.title:
             ax.set_title(r'%s' % self.title)
         leg = []
@@ -344,15 +448,130 @@ class Montgomery:
             ax.set_xlim(self.xmin, self.xmax)
         if self.ymax:
             ax.set_ylim(self.ymin, self.ymax)
-        pylab.savefig(output)
+        pylab.figure(fig.number)
+        savefig(output)
+
+def gue_table(input_file, sep='\t'):
+    """Read a table made by gue.py: the bins, the pair correlation of
+    the zeros and Montgomery's function, as float arrays.
+
+    """
+    values = numpy.loadtxt(input_file, delimiter=sep, usecols=(0, 1, 2),
+                           ndmin=2)
+    return values[:, 0], values[:, 1], values[:, 2]
+
+def gue_files(inputs):
+    """Tables given as files, directories (every gue*.txt in it) or
+    globs.
+
+    """
+    files = []
+    for i in inputs:
+        if os.path.isdir(i):
+            files.extend(sorted(glob.glob(os.path.join(i, 'gue*.txt'))))
+        elif glob.has_magic(i):
+            files.extend(sorted(glob.glob(i)))
+        else:
+            files.append(i)
+    return files
+
+_batch_figure = [None]
+
+def _gue_one(job):
+    """Render one table of a batch, reusing the figure of the process."""
+    input_file, output, options = job
+    if _batch_figure[0] is None:
+        _batch_figure[0] = pylab.figure()
+    m = Montgomery(input_file)
+    for k, v in options.items():
+        setattr(m, k, v)
+    name = os.path.splitext(os.path.basename(input_file))[0]
+    if m.title:
+        m.title = m.title.replace('%(name)s', name)
+    m.make_graph(output, _batch_figure[0])
+    return output
+
+def gue_batch(inputs, output_dir='.', format='pdf', processes=1, **options):
+    """Render every GUE table in `inputs` (files, directories or globs)
+    to `output_dir`, with the same name and extension `format`. All
+    the graphs of a process are drawn in the same figure. The keywords
+    are attributes of Montgomery; in the title %(name)s is the name of
+    the table. Return the list of files written.
+
+    """
+    options.setdefault('title', '')
+    jobs = []
+    for f in gue_files(inputs):
+        name = os.path.splitext(os.path.basename(f))[0]
+        jobs.append((f, os.path.join(output_dir, '%s.%s' % (name, format)),
+                     options))
+    if processes > 1:
+        pool = multiprocessing.Pool(processes)
+        try:
+            outputs = pool.map(_gue_one, jobs, 1)
+        finally:
+            pool.close()
+            pool.join()
+        return outputs
+    try:
+        return [_gue_one(job) for job in jobs]
+    finally:
+        if _batch_figure[0] is not None:
+            pylab.close(_batch_figure[0])
+            _batch_figure[0] = None
+
+def gue_compare(output, inputs, labels=None, mode='overlay', xmin=0.02,
+                xmax=1.9, ymin=0, ymax=1.2, color_gue='#708DFF',
+                markersize=4, profile=''):
+    """Compare GUE tables at different heights, e.g. 10^5, 10^9 and
+    10^12, in one figure. With mode 'overlay' the points of all of them
+    are drawn over Montgomery's function, with mode 'grid' each table
+    has its own panel, side by side.
+
+    """
+    files = gue_files(inputs)
+    if not labels:
+        labels = [os.path.splitext(os.path.basename(f))[0].replace('_', ' ')
+                  for f in files]
+    colors = ['#FF0000', '#00A000', '#FF8C00', '#8B008B', '#000000']
+    symbols = ['o', 's', '^', 'v', 'D']
+    with rendering(profile):
+        if mode == 'grid':
+            fig, axes = pylab.subplots(1, len(files), sharey=True,
+                                       squeeze=False,
+                                       figsize=(fig_width*len(files)/1.5,
+                                                fig_height))
+            axes = list(axes[0])
+        else:
+            fig = pylab.figure()
+            axes = [fig.add_subplot(111)]*len(files)
+        try:
+            for i, (f, label) in enumerate(zip(files, labels)):
+                ax = axes[i]
+                x, points, gue = gue_table(f)
+                if mode == 'grid' or i == 0:
+                    ax.plot(x, gue, '-', color=color_gue, linewidth=1.5)
+                    ax.fill_between(x, 0, gue, color=color_gue, alpha=.10)
+                ax.plot(x, points, symbols[i % len(symbols)],
+                        color=colors[i % len(colors)],
+                        markersize=markersize, label=r'%s' % label)
+                ax.set_xlim(xmin, xmax)
+                ax.set_ylim(ymin, ymax)
+                if mode == 'grid':
+                    ax.set_title(r'%s' % label)
+            if mode != 'grid':
+                l = axes[0].legend(loc=4, numpoints=1)
+                l.get_frame().set_linewidth(0.1)
+            savefig(output, bbox_inches='tight')
+        finally:
+            pylab.close(fig)
 
 def proof_xhalf(output):
     """Graph to show that x=1/2 in RH."""
-    f = zeros.xhalf
     fig = pylab.figure()
     ax = fig.add_subplot(111)
     xaxis = pylab.arange(0.0, 1.1, 0.0005)
-    yaxis1 = [f(279.2, x) for x in xaxis]
+    yaxis1 = sweep.sweep(xaxis, 279.2, mirror=True).xhalf()[0]
     p1 = ax.plot(xaxis, yaxis1)
     p2 = ax.plot(xaxis, [x-0.5 for x in xaxis], color='r')
     ax.set_xlim(0, 1.0)
@@ -367,15 +586,14 @@ def proof_xhalf(output):
     l = ax.legend([r'RHS ($19$)', r'LHS ($19$)'], loc=0)
     l.get_frame().set_linewidth(0.0)
     l.get_frame().set_fill(False)
-    pylab.savefig(output)
+    savefig(output)
 
 def proof_mbounded(output):
     """Show that m is bounded."""
-    f = zeros.almost_transeq
     fig = pylab.figure()
     ax = fig.add_subplot(111)
     xaxis = pylab.arange(0.0, 1.0, 0.0001)
-    yaxis1 = [f(x) for x in xaxis]
+    yaxis1 = cache.curve(zeros.almost_transeq, xaxis)
     p1 = ax.plot(xaxis, yaxis1)
     ax.set_xlim(0, 1.0)
     #ax.xaxis.set_ticks([0, 0.5, 1.0])
@@ -383,14 +601,13 @@ def proof_mbounded(output):
     l = ax.legend([r'RHS ($20$)'], loc=0)
     l.get_frame().set_linewidth(0.0)
     l.get_frame().set_fill(False)
-    pylab.savefig(output)
+    savefig(output)
 
 def plot_arg(output):
-    f = zeros.argzeta
     fig = pylab.figure()
     ax = fig.add_subplot(111)
     xaxis = pylab.arange(0.1, 40.0, 0.1)
-    yaxis1 = [f(x) for x in xaxis]
+    yaxis1 = cache.curve(zeros.argzeta, xaxis)
     pylab.fill_between(xaxis, 0, yaxis1, color='b', alpha=.10)
     p1 = ax.plot(xaxis, yaxis1)
     ax.set_xlim(0.0, 40)
@@ -402,17 +619,15 @@ def plot_arg(output):
         loc=2)
     pylab.gca().add_artist(l)
     l.get_frame().set_linewidth(0.0)
-    pylab.savefig(output)
+    savefig(output)
 
 def plot_cos_sin(output):
-    c = functools.partial(zeros.costheta, 0.5+0.05)
-    s = functools.partial(zeros.sintheta, 0.5+0.01)
     fig = pylab.figure()
     ax = fig.add_subplot(111)
     #xaxis = pylab.arange(13.75, 14.5, 0.001)
     xaxis = pylab.arange(20.5, 21.5, 0.001)
-    yaxis1 = [c(x) for x in xaxis]
-    yaxis2 = [s(x) for x in xaxis]
+    yaxis1 = cache.curve(zeros.costheta, xaxis, 0.5+0.05)
+    yaxis2 = cache.curve(zeros.sintheta, xaxis, 0.5+0.01)
     p1 = ax.plot(xaxis, yaxis1)
     p2 = ax.plot(xaxis, yaxis2, color='r')
     #ax.set_xlim(13.75, 14.5)
@@ -430,16 +645,14 @@ def plot_cos_sin(output):
                    r'$\sin\theta(\tfrac{1}{2}+\delta,y)$'], loc=(0.0, 0.1))
     l.get_frame().set_linewidth(0.0)
     l.get_frame().set_fill(False)
-    pylab.savefig(output)
+    savefig(output)
 
 def plot_counting(output):
-    f = zeros.counting_function
-    g = zeros.counting_function_smooth
     fig = pylab.figure()
     ax = fig.add_subplot(111)
     xaxis = pylab.arange(0.0, 40.0, 0.05)
-    yaxis1 = [f(x) for x in xaxis]
-    yaxis2 = [g(x) for x in xaxis]
+    yaxis1 = cache.curve(zeros.counting_function, xaxis)
+    yaxis2 = zeros.counting_function_smooth_array(xaxis)
     p1 = ax.plot(xaxis, yaxis1)
     p2 = ax.plot(xaxis, yaxis2, '--', color='r')
     pylab.fill_between(xaxis, -0.5, yaxis1, color='b', alpha=.10)
@@ -447,21 +660,18 @@ def plot_counting(output):
     ax.set_ylim(-0.5, 6.4)
     #ax.xaxis.set_ticks([0, 0.5, 1.0])
     #ax.xaxis.set_ticklabels([r'$0$', r'$\tfrac{1}{2}$', r'$1$'])
-    l = pylab.legend([r'$N_0(T)$', r'\tfrac{T}{2\pi}\log\left(\tfrac{T}{2\pi e}\right) + \tfrac{7}{8}$'], loc=0)
+    l = pylab.legend([r'$N_0(T)$', r'$\tfrac{T}{2\pi}\log\left(\tfrac{T}{2\pi e}\right) + \tfrac{7}{8}$'], loc=0)
     pylab.gca().add_artist(l)
     l.get_frame().set_linewidth(0.0)
-    pylab.savefig(output)
+    savefig(output)
 
-plot_counting("counting_func.pdf")
+#plot_counting("counting_func.pdf")
 
 def plot_arge(output):
-    f = zeros.argzeta
-    fe = functools.partial(zeros.argzetae, 1.0/20.0)
     fig = pylab.figure()
     ax = fig.add_subplot(111)
     xaxis = pylab.arange(1004, 1011, 0.02)
-    yaxis1 = [f(x) for x in xaxis]
-    yaxis2 = [fe(x) for x in xaxis]
+    yaxis1, yaxis2 = sweep.sweep([0.5, 0.5 + 1.0/20.0], xaxis).arg().T
     p1 = ax.plot(xaxis, yaxis1)
     p2 = ax.plot(xaxis, yaxis2, '--', color='r')
     #ax.set_xlim(0.0, 40)
@@ -474,17 +684,15 @@ def plot_arge(output):
     #pylab.gca().add_artist(l)
     #l.get_frame().set_linewidth(0.0)
     #l.get_frame().set_fill(False)
-    pylab.savefig(output)
+    savefig(output)
 
 def plot_tricky(output):
     n = 655
-    f = functools.partial(zeros.transeq, n)
-    fe = functools.partial(zeros.transeqe, n, 1.0/100.0)
     fig = pylab.figure()
     ax = fig.add_subplot(111)
     xaxis = pylab.arange(1007.2, 1008.7, 0.005)
-    yaxis1 = [f(x) for x in xaxis]
-    yaxis2 = [fe(x) for x in xaxis]
+    yaxis1 = cache.curve(zeros.transeq, xaxis, n)
+    yaxis2 = cache.curve(zeros.transeqe, xaxis, n, 1.0/100.0)
     p1 = ax.plot(xaxis, yaxis1)
     p2 = ax.plot(xaxis, yaxis2, '--', color='r')
     ax.set_xlim(1007.2, 1008.7)
@@ -498,9 +706,13 @@ def plot_tricky(output):
     #pylab.gca().add_artist(l)
     l.get_frame().set_linewidth(0.0)
     l.get_frame().set_fill(False)
-    pylab.savefig(output)
+    savefig(output)
+
+def plot_prime(output, input_table, lambert=False, both=False, profile=''):
+    with rendering(profile):
+        _plot_prime(output, input_table, lambert, both)
 
-def plot_prime(output, input_table, lambert=False, both=False):
+def _plot_prime(output, input_table, lambert=False, both=False):
     f = open(input_table)
     xvals = []; pitvals = []; pizvals = []; pilvals = []
     for l in f:
@@ -540,22 +752,22 @@ def plot_prime(output, input_table, lambert=False, both=False):
     #pylab.gca().add_artist(l)
     #l.get_frame().set_linewidth(0.0)
     #l.get_frame().set_fill(False)
-    pylab.savefig(output)
+    savefig(output)
 
 #plot_prime('zeta_prime_20.pdf', 'table20')
 #plot_prime('zeta_prime_50.pdf', 'table50')
 #plot_prime('zeta_prime_100.pdf', 'table100')
 
 def plot_gamma_zeta(output):
-    f = functools.partial(zeros.ratio_gamma, 14.1)
-    g = functools.partial(zeros.ratio_zeta, 14.1)
     fig = pylab.figure()
     ax = fig.add_subplot(111)
     xaxis = pylab.arange(0, 1, 0.0005)
-    #yaxis1 = [mpmath.re(f(x)) for x in xaxis]
-    #yaxis2 = [mpmath.re(g(x)) for x in xaxis]
-    yaxis1 = [mpmath.im(f(x)) for x in xaxis]
-    yaxis2 = [mpmath.im(g(x)) for x in xaxis]
+    f = cache.curve(zeros.ratio_gamma, xaxis, 14.1)
+    g = cache.curve(zeros.ratio_zeta, xaxis, 14.1)
+    #yaxis1 = f.real
+    #yaxis2 = g.real
+    yaxis1 = f.imag
+    yaxis2 = g.imag
     p1 = ax.plot(xaxis, yaxis1)
     p2 = ax.plot(xaxis, yaxis2, color='r')
     #ax.set_ylim(-1.2, 1.2)
@@ -585,17 +797,16 @@ def plot_gamma_zeta(output):
         loc=2)
     l.get_frame().set_linewidth(0.0)
     l.get_frame().set_fill(False)
-    pylab.savefig(output)
+    savefig(output)
 
 def plot_ratio_chi(output):
-    f = functools.partial(zeros.ratio_func_eq, 14.1)
-    g = zeros.piexp
     fig = pylab.figure()
     ax = fig.add_subplot(111)
     xaxis = pylab.arange(0, 1, 0.0005)
-    yaxis1 = [mpmath.re(f(x)) for x in xaxis]
-    yaxis2 = [mpmath.im(f(x)) for x in xaxis]
-    yaxis3 = [g(x) for x in xaxis]
+    f = cache.curve(zeros.ratio_func_eq, xaxis, 14.1)
+    yaxis1 = f.real
+    yaxis2 = f.imag
+    yaxis3 = cache.curve(zeros.piexp, xaxis)
     p1 = ax.plot(xaxis, yaxis1)
     p2 = ax.plot(xaxis, yaxis2, color='r')
     p3 = ax.plot(xaxis, yaxis3, color='g')
@@ -616,7 +827,7 @@ def plot_ratio_chi(output):
     #l1.get_frame().set_fill(False)
     #l2.get_frame().set_linewidth(0.0)
     #l2.get_frame().set_fill(False)
-    pylab.savefig(output)
+    savefig(output)
 
 
 ###############################################################################
@@ -624,12 +835,13 @@ def plot_ratio_chi(output):
 ###############################################################################
 
 import prime
+import randmat
 
 def plot_prime_li(output, n):
     """Comparison of PrimePi function and Li."""
     x = pylab.arange(0, n, 0.05)
-    y = [prime.pi_true(i) for i in x]
-    z = [mpmath.li(i) for i in x]
+    y = sampling.sample(prime.pi_true, x)
+    z = sampling.sample(mpmath.li, x)
     fig = pylab.figure()
     ax = fig.add_subplot(111)
     p1 = ax.plot(x, y, color='b')
@@ -639,12 +851,12 @@ def plot_prime_li(output, n):
     l = ax.legend([r'$\pi(x)$', r'$\rm{Li}(x)$'], loc=2)
     l.get_frame().set_linewidth(0.0)
     l.get_frame().set_fill(False)
-    pylab.savefig(output)
+    savefig(output)
 
 def plot_j(output, x):
     """Comparison of PrimePi function and Li."""
     xvals = pylab.arange(0, x, 0.005)
-    yvals = [prime.j_mangoldt(i) for i in xvals]
+    yvals = sampling.sample(prime.j_mangoldt, xvals)
     fig = pylab.figure()
     ax = fig.add_subplot(111)
     p1 = ax.plot(xvals, yvals, color='b')
@@ -653,7 +865,7 @@ def plot_j(output, x):
     l = ax.legend([r'$J(x)$'], loc=2)
     l.get_frame().set_linewidth(0.0)
     l.get_frame().set_fill(False)
-    pylab.savefig(output)
+    savefig(output)
 
 def plot_ratio_zeta(output, y):
     """Comparison of PrimePi function and Li."""
@@ -671,16 +883,15 @@ def plot_ratio_zeta(output, y):
     ax.set_xlabel(r'$y$')
     ax.xaxis.set_ticks_position('bottom')
     pylab.tight_layout()
-    pylab.savefig(output)
+    savefig(output)
 
 def plot_arg_zeta(output):
     f = open('~/output.txt')
 
-    f = zeros.argzetae
     fig = pylab.figure()
     ax = fig.add_subplot(111)
     xaxis = pylab.arange(1437, 1442, 0.02)
-    yaxis1 = [f(0.000001, x) for x in xaxis]
+    yaxis1 = cache.curve(zeros.argzetae, xaxis, 0.000001)
     #yaxis2 = [f(0.01, x) for x in xaxis]
     #pylab.fill_between(xaxis, 0, yaxis1, color='b', alpha=.10)
     p1 = ax.plot(xaxis, yaxis1)
@@ -698,12 +909,13 @@ def plot_arg_zeta(output):
     pylab.gca().add_artist(l)
     l.get_frame().set_linewidth(0.0)
     l.get_frame().set_fill(False)
-    pylab.savefig(output)
+    savefig(output)
 
-def plot_dots_gue(output):
+def plot_dots_gue(output, seed=0):
     zeros = [float(l) for l in open('zeros.dat')]
     randoms = [float(l) for l in open('randoms.dat')]
-    eigs = [float(l) for l in open('eigs.dat')]
+    # eigenvalues of a GUE matrix in the same interval as the zeros
+    eigs = randmat.points(len(zeros), zeros[0], zeros[-1], seed)
     fig = pylab.figure()
     fig.set_size_inches(6.5, 1.5)
     ax = fig.add_subplot(111)
@@ -729,7 +941,7 @@ def plot_dots_gue(output):
     l.get_frame().set_linewidth(0.4)
     l.get_frame().set_fill(False)
     pylab.tight_layout()
-    pylab.savefig(output)
+    savefig(output)
 
 #plot_dots_gue('/home/gui/Dropbox/RiemannLectures/Lect3/figs/dots_gue.pdf')
 
@@ -14,17 +14,12 @@ from mpmath import *
 from numpy import arange
 
 import zeros
+import zeroarray
 
 
 def get_zeros(n, filename):
-    """We get n zeros from the file."""
-    f = open(filename)
-    zeros = []
-    for i, line in enumerate(f):
-        if i >= n:
-            break
-        zeros.append(mpf(line.strip()))
-    return zeros
+    """We get n zeros from the file, as a `zeroarray.ZeroArray`."""
+    return zeroarray.read(filename, 1, n)
 
 def bound(t, x):
     """This function is used to define the upper and lower bound
@@ -18,6 +18,9 @@ Physics Department, Cornell University
 from mpmath import *
 from numpy import arange
 
+import unfold
+import zeroarray
+
 mp.dps = 15
 #pretty = True
 
@@ -26,23 +29,11 @@ def get_zeros(m, n, filename, starting=0):
     a way that contains the interval of interest, starting from the
     lowest to the highest zero. We also take the first and last
     zeros that correspond to the size on the line, i.e. `t1` and `t2`.
+    The zeros are a `zeroarray.ZeroArray`.
     
     """
-    if starting:
-        m = m+1- starting
-        n = n+1- starting
-    zeros = []
-    for i, line in enumerate(open(filename)):
-        if i+1 < m:
-            continue
-        if i+1 > n:
-            break
-        y = mpf(line.strip())
-        zeros.append(y)
-        if i+1 == m:
-            t1 = y
-    t2 = y
-    return zeros, t1, t2
+    zeros = zeroarray.read(filename, m, n, starting or 1)
+    return zeros, zeros[0], zeros[-1]
 
 def delta_n(n, zeros):
     """Normalized spacing between neighboring zeros. This is the main 
@@ -67,6 +58,14 @@ def pair_correlation(zeros, alpha, beta):
     #x = (alpha + beta)/2.0
     return float(summatory)
 
+def pair_correlation_unfolded(x, alpha, beta):
+    """The same as `pair_correlation` for zeros already unfolded by
+    `unfold.unfold`, with method 'local' it gives the same counts. As
+    there, the last zero is never taken as the partner of a pair.
+    
+    """
+    return float(unfold.pair_counts(x[:-1], [alpha], [beta])[0])
+
 def gue_correlation(alpha, beta):
     """Compute the GUE 2-point correlation function."""
     f = lambda x: 1.0 - power(sin(pi*x)/(pi*x), 2)
@@ -123,3 +122,20 @@ def main(highest, lowest, alpha, step, input_file, output_file, starting=0):
         out.write('%.4f\t%.10f\t%.10f\n' % (x, corr, gue))
         print 'Doing point %.4f of %.4f' % (x, last_point)
 
+def main_unfolded(unfolded_file, alpha, step, output_file):
+    """The same table as `main`, from a .npy file of unfolded zeros
+    made by `unfold.unfold_file`. All the bins are counted at once.
+    
+    """
+    unfolded = unfold.load(unfolded_file)
+    difference = len(unfolded) - 1
+    alphas = arange(alpha[0], alpha[1], step)
+    betas = arange(alpha[0]+step, alpha[1]+step, step)
+    counts = unfold.pair_counts(unfolded, alphas, betas)
+    out = open(output_file, 'w')
+    for a, b, c in zip(alphas, betas, counts):
+        x = (a+b)/2.0
+        corr = float(c)/difference/step
+        gue = gue_correlation(a, b)/step
+        out.write('%.4f\t%.10f\t%.10f\n' % (x, corr, gue))
+    out.close()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+
+"""
+Zeros of Dirichlet L-functions from the transcendental equation.
+
+For a primitive character chi mod q with chi(-1) = (-1)^a, Franca and
+LeClair show that the n-th zero on the critical line, 1/2 + i t_n,
+satisfies
+
+    t/2pi log(q t/2pi e) + (2a+3)/8 - n + S(t) - S(0) = 0,
+
+with S(t) = arg L(1/2+it, chi)/pi. Without S it gives the Lambert
+estimative
+
+    t_n = 2 pi m / W(q m/e),    m = n - (2a+3)/8.
+
+This is not `zeros.transeq` for q = 1: the pole of zeta moves the
+constant (2a+3)/8 to 11/8, and there S(0) = 0.
+
+An `L` object has the same functions as the module `zeros` (`zerow`,
+`transeq`, `transeqe`, `transeqd`), so it can be passed to
+`zeros.findzero` and `zeros.findzero3` as the `lfunc` argument.
+
+The characters are built from the structure of (Z/qZ)^*. All the
+characters mod q are evaluated together:
+
+    L(s, chi) = q^-s sum_{r=1}^{q} chi(r) zeta(s, r/q),
+
+so the q Hurwitz zeta values are shared and L for every character is
+one matrix product. `batch` uses this to find the zeros of all the
+characters mod q in one run.
+
+"""
+
+from mpmath import *
+import numpy
+from scipy.optimize import brentq
+
+
+def _factor(q):
+    """Prime factorization of q as a list of (p, k)."""
+    factors = []
+    p = 2
+    while p*p <= q:
+        k = 0
+        while q % p == 0:
+            q /= p
+            k += 1
+        if k:
+            factors.append((p, k))
+        p += 1
+    if q > 1:
+        factors.append((q, 1))
+    return factors
+
+def _order(g, m):
+    k, x = 1, g % m
+    while x != 1:
+        x = x*g % m
+        k += 1
+    return k
+
+def _generators(q):
+    """Generators of (Z/qZ)^* as a list of (modulus of the prime power,
+    generator, order). Every unit mod q has unique exponents of them.
+
+    """
+    gens = []
+    for p, k in _factor(q):
+        m = p**k
+        if p == 2:
+            if k >= 2:
+                gens.append((m, m-1, 2))
+            if k >= 3:
+                gens.append((m, 5, m/4))
+        else:
+            phi = m/p*(p-1)
+            g = 2
+            while _order(g, m) != phi:
+                g += 1
+            gens.append((m, g, phi))
+    return gens
+
+def _logs(q, gens):
+    """Exponents of each generator for every residue r mod q, -1 when
+    r is not a unit.
+
+    """
+    logs = -numpy.ones((len(gens), q), dtype=numpy.int64)
+    units = [r for r in range(q) if _gcd(r, q) == 1]
+    for i, (m, g, order) in enumerate(gens):
+        table = {}
+        x = 1
+        for j in range(order):
+            table[x] = j
+            x = x*g % m
+        for r in units:
+            x = r % m
+            if g == 5:
+                # r = +-5^j mod 2^k, the sign is the generator m - 1
+                x = x if x % 4 == 1 else m - x
+            elif g == m - 1 and m % 4 == 0:
+                x = 1 if x % 4 == 1 else m - 1
+            logs[i, r] = table[x]
+    return logs
+
+def _gcd(a, b):
+    while b:
+        a, b = b, a % b
+    return a
+
+class Character:
+    """A Dirichlet character mod q, given by the exponents `index` of
+    the values at the generators. `values` are chi(0), ..., chi(q-1).
+
+    """
+
+    def __init__(self, q, index, values):
+        self.q = q
+        self.index = index
+        self.values = values
+        self.a = 0 if q < 3 or values[q-1].real > 0 else 1
+        self.conductor = self._conductor()
+        self.primitive = self.conductor == q
+        self.real = bool(numpy.all(abs(values.imag) < 1e-12))
+
+    def __call__(self, n):
+        return self.values[n % self.q]
+
+    def _conductor(self):
+        units = [r for r in range(self.q) if _gcd(r, self.q) == 1]
+        for d in range(1, self.q+1):
+            if self.q % d:
+                continue
+            if all([abs(self.values[r] - 1) < 1e-9 for r in units
+                    if r % d == 1 % d]):
+                return d
+        return self.q
+
+    def label(self):
+        return 'q%i_%s' % (self.q, '_'.join([str(i) for i in self.index]))
+
+def characters(q):
+    """All the characters mod q, the principal one first."""
+    gens = _generators(q)
+    logs = _logs(q, gens)
+    orders = [order for m, g, order in gens]
+    indexes = [()]
+    for order in orders:
+        indexes = [i + (c,) for i in indexes for c in range(order)]
+    chars = []
+    for index in indexes:
+        phase = numpy.zeros(q)
+        for c, order, l in zip(index, orders, logs):
+            phase += float(c)*l/order
+        values = numpy.exp(2j*numpy.pi*phase)
+        values[numpy.array([_gcd(r, q) != 1 for r in range(q)])] = 0.0
+        # exact values for the real characters
+        values.real[abs(values.real) < 1e-14] = 0.0
+        values.imag[abs(values.imag) < 1e-14] = 0.0
+        chars.append(Character(q, index, values))
+    return chars
+
+def primitive_characters(q):
+    return [chi for chi in characters(q) if chi.primitive]
+
+def lvalues(chars, s):
+    """L(s, chi) for all the characters `chars`, which have the same
+    modulus, as a numpy array. The Hurwitz zeta values are shared.
+
+    """
+    q = chars[0].q
+    units = [r for r in range(1, q+1) if _gcd(r, q) == 1]
+    h = numpy.array([complex(zeta(s, mpf(r)/q)) for r in units])
+    table = numpy.array([[chi(r) for r in units] for chi in chars])
+    return complex(power(q, -s))*numpy.dot(table, h)
+
+class L:
+    """The L-function of a primitive character `chi`, with the functions
+    used by the zero finders.
+
+    """
+
+    def __init__(self, chi):
+        if not chi.primitive:
+            raise ValueError('character %s is not primitive' % chi.label())
+        self.chi = chi
+        self.q = chi.q
+        self.a = chi.a
+        self.constant = (2.0*self.a + 3.0)/8.0
+        self.s0 = arg(self.value(mpf(0.5)))/pi
+
+    def value(self, s):
+        return lvalues([self.chi], s)[0]
+
+    def argl(self, y, s=0.0):
+        """S(y) = arg L(1/2+s+iy, chi)/pi."""
+        return numpy.angle(self.value(mpc(0.5+s, y)))/pi
+
+    def zerow(self, n):
+        """Lambert estimative of the n-th zero."""
+        m = n - self.constant
+        return 2.0*pi*m/lambertw(self.q*m/e)
+
+    def transeq_first(self, n, y):
+        return y/2.0/pi*log(self.q*y/2.0/pi/e) + self.constant - n
+
+    def transeq(self, n, y):
+        return self.transeq_first(n, y) + self.argl(y) - self.s0
+
+    def transeqe(self, n, s, y):
+        """Dislocate by s from the critical line."""
+        return self.transeq_first(n, y) + self.argl(y, s) - self.s0
+
+    def transeqd(self, n, d, y):
+        return self.transeq(n, y) + d
+
+def batch(q, n1, n2, chars=None, points=8, xtol=1e-12, verbose=False):
+    """Zeros n1..n2 of L(s, chi) for the primitive characters mod q (or
+    the ones given in `chars`). L is evaluated for all characters at
+    once on a grid with `points` points per mean spacing, which
+    brackets every zero between two points where the left hand side
+    of the equation changes sign; then each zero is refined by Brent's
+    method. Return a dictionary label -> list of zeros.
+
+    """
+    if chars is None:
+        chars = primitive_characters(q)
+    lfuncs = [L(chi) for chi in chars]
+    lo = min([float(l.zerow(n1)) for l in lfuncs])
+    hi = max([float(l.zerow(n2)) for l in lfuncs])
+    # the smallest mean spacing, at the top of the range
+    spacing = 2*numpy.pi/numpy.log(q*hi/2.0/numpy.pi + 1.0)
+    lo = max(lo - 2*spacing, 0.1)
+    hi = hi + 2*spacing
+    h = spacing/points
+    grid = numpy.arange(lo, hi + h, h)
+    s0 = numpy.array([l.s0 for l in lfuncs])
+    const = numpy.array([l.constant for l in lfuncs])
+    counts = numpy.empty((len(lfuncs), len(grid)))
+    for k, y in enumerate(grid):
+        v = lvalues(chars, mpc(0.5, y))
+        smooth = y/2.0/numpy.pi*numpy.log(q*y/2.0/numpy.pi/numpy.e)
+        # number of zeros below y, the equation is counts - n + 1/2
+        counts[:, k] = smooth + const - 0.5 + numpy.angle(v)/numpy.pi - s0
+        if verbose and k % 100 == 0:
+            print 'grid %i of %i' % (k, len(grid))
+    counts = numpy.maximum.accumulate(numpy.round(counts), axis=1)
+    result = {}
+    for l, c in zip(lfuncs, counts):
+        found = []
+        for n in range(n1, n2+1):
+            k = numpy.searchsorted(c, n)
+            if k == 0 or k == len(grid):
+                raise ValueError('zero %i of %s is out of the grid' %
+                                 (n, l.chi.label()))
+            f = lambda y: float(l.transeq(n, y))
+            found.append(brentq(f, grid[k-1], grid[k], xtol=xtol))
+        result[l.chi.label()] = found
+    return result
+
+def goodzeros(q, n1, n2, prefix='', chars=None):
+    """Write the zeros n1..n2 of every primitive character mod q, one
+    file per character, named prefix_label.txt, with one zero per line.
+
+    """
+    if not prefix:
+        prefix = 'lzeros_%i_%i' % (n1, n2)
+    result = batch(q, n1, n2, chars, verbose=True)
+    for label in sorted(result):
+        output = open('%s_%s.txt' % (prefix, label), 'w')
+        for z in result[label]:
+            output.write("%.20f\n" % z)
+        output.close()
+    return result
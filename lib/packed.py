@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+
+"""
+Compressed tables of zeros (.rzt files).
+
+A zero written as %.20f takes about 30 bytes, but most of them are the
+digits shared with its neighbours: consecutive zeros differ by about
+2 pi/log(t/2pi). Here each zero is a fixed point integer Y_n, the zero
+times 10^decimals, and the table is cut in blocks of BLOCK zeros. A
+block keeps its first Y and the mean M of its differences, and each
+other zero as the residual
+
+    R_n = (Y_n - Y_{n-1}) - M,
+
+zigzag encoded (0, -1, 1, -2, ... -> 0, 1, 2, 3, ...) so it is a small
+non negative integer, written with the fewest bytes that hold the
+largest one in the block. The bytes are stored by planes (all the
+lowest bytes, then the next ones, ...), where the high planes are
+almost constant, and compressed with zlib. The residual from the
+previous zero is used instead of the one from `zeros.zerow(n)` because
+it only needs integer arithmetic, so the file decodes to exactly the
+same digits on any machine.
+
+The file is
+
+    header   'RZT1', first index, count, decimals, BLOCK, number of
+             blocks, offset of the index
+    blocks   each one independent of the others
+    index    offset of every block, and of the index itself
+
+so reading the row i costs one seek and decompressing one block. By
+default we keep every decimal written in the table, the most of any
+row, so unpacking gives back the same numbers. With `decimals` given
+the rows are rounded to that many places, and the rest is lost.
+
+`tables.Table` opens .rzt files, so they can be used everywhere a table
+is read, and the catalog finds them in data/.
+
+"""
+
+import zlib
+import struct
+import decimal
+
+import numpy
+
+
+MAGIC = 'RZT1'
+HEADER = '<4sQQIIIQ'
+BLOCK = 4096
+# enough digits for any row
+CONTEXT = decimal.Context(prec=200)
+
+def _fixed(row, decimals):
+    """The integer `row` * 10^decimals, rounded."""
+    d = decimal.Decimal(row).scaleb(decimals, CONTEXT)
+    return int(d.to_integral_value(decimal.ROUND_HALF_EVEN, CONTEXT))
+
+def _written(row):
+    """Decimal places written in `row`."""
+    return max(-decimal.Decimal(row).as_tuple().exponent, 0)
+
+def _row(y, decimals):
+    """The integer y as a number with `decimals` decimal places."""
+    s = str(abs(y)).rjust(decimals + 1, '0')
+    sign = '-' if y < 0 else ''
+    if not decimals:
+        return sign + s
+    return sign + s[:-decimals] + '.' + s[-decimals:]
+
+def _planes(z, width):
+    """The bytes of the non negative integers z, by planes."""
+    z = list(z)
+    lo = numpy.array([x & 0xffffffffffffffff for x in z], dtype='<u8')
+    hi = numpy.array([x >> 64 for x in z], dtype='<u8')
+    b = numpy.hstack([lo.view(numpy.uint8).reshape(-1, 8),
+                      hi.view(numpy.uint8).reshape(-1, 8)])
+    return b[:, :width].T.tostring()
+
+def encode(values, decimals):
+    """One block from the integers `values`."""
+    anchor = values[0]
+    deltas = [b - a for a, b in zip(values, values[1:])]
+    mean = int(round(float(sum(deltas))/len(deltas))) if deltas else 0
+    z = [2*r if r >= 0 else -2*r - 1 for r in [d - mean for d in deltas]]
+    width = 0
+    if z:
+        width = max(1, (max(z).bit_length() + 7)/8)
+    if width > 16:
+        raise ValueError('spacings too large for %i decimals' % decimals)
+    head = '%i %i %i %i ' % (anchor, mean, len(values), width)
+    return struct.pack('<H', len(head)) + head + \
+           zlib.compress(_planes(z, width), 9)
+
+def _decode_head(data):
+    n = struct.unpack('<H', data[:2])[0]
+    anchor, mean, count, width = [int(x) for x in data[2:2+n].split()]
+    return anchor, mean, count, width, data[2+n:]
+
+def _bytes(planes, count, width):
+    b = numpy.zeros((count - 1, 16), dtype=numpy.uint8)
+    b[:, :width] = numpy.frombuffer(planes, dtype=numpy.uint8).reshape(
+                       width, count - 1).T
+    return b
+
+def decode(data, decimals):
+    """The zeros of a block as a float64 array."""
+    anchor, mean, count, width, rest = _decode_head(data)
+    values = numpy.empty(count)
+    values[0] = float(_row(anchor, decimals))
+    if count == 1:
+        return values
+    b = _bytes(zlib.decompress(rest), count, width)
+    lo = b[:, :8].copy().view('<u8').ravel()
+    hi = b[:, 8:].copy().view('<u8').ravel()
+    z = lo.astype(numpy.float64) + hi.astype(numpy.float64)*2.0**64
+    r = numpy.where(lo & 1, -(z + 1)/2.0, z/2.0)
+    values[1:] = values[0] + numpy.cumsum(r + mean)/10.0**decimals
+    return values
+
+def decode_exact(data):
+    """The integers of a block."""
+    anchor, mean, count, width, rest = _decode_head(data)
+    values = [anchor]
+    if count == 1:
+        return values
+    b = _bytes(zlib.decompress(rest), count, width)
+    for row in b[:, :width]:
+        z = int(row[::-1].tostring().encode('hex'), 16)
+        r = z/2 if z % 2 == 0 else -(z + 1)/2
+        values.append(values[-1] + r + mean)
+    return values
+
+class Packed:
+    """A .rzt table, indexed like an array of float64."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        f = open(filename, 'rb')
+        magic, self.first, self.size, self.decimals, self.block, blocks, \
+            index = struct.unpack(HEADER, f.read(struct.calcsize(HEADER)))
+        if magic != MAGIC:
+            raise ValueError('%s is not a packed table' % filename)
+        f.seek(index)
+        self.offsets = numpy.frombuffer(f.read(8*(blocks + 1)), dtype='<u8')
+        f.close()
+        self._cache = (None, None)
+
+    def __len__(self):
+        return self.size
+
+    def _data(self, b):
+        f = open(self.filename, 'rb')
+        f.seek(int(self.offsets[b]))
+        data = f.read(int(self.offsets[b+1] - self.offsets[b]))
+        f.close()
+        return data
+
+    def _block(self, b):
+        if self._cache[0] != b:
+            self._cache = (b, decode(self._data(b), self.decimals))
+        return self._cache[1]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.size)
+            if step != 1:
+                return self[numpy.arange(start, stop, step)]
+            parts = [self._block(b)[max(start - b*self.block, 0):
+                                    stop - b*self.block]
+                     for b in range(start/self.block,
+                                    (stop - 1)/self.block + 1)]
+            return numpy.concatenate(parts) if parts else numpy.empty(0)
+        if numpy.isscalar(key):
+            key = int(key)
+            if key < 0:
+                key += self.size
+            if not 0 <= key < self.size:
+                raise IndexError('row out of range')
+            return self._block(key/self.block)[key % self.block]
+        key = numpy.asarray(key, dtype=numpy.int64)
+        key = numpy.where(key < 0, key + self.size, key)
+        if len(key) and (key.min() < 0 or key.max() >= self.size):
+            raise IndexError('row out of range')
+        values = numpy.empty(len(key))
+        blocks = key/self.block
+        for b in numpy.unique(blocks):
+            k = blocks == b
+            values[k] = self._block(b)[key[k] - b*self.block]
+        return values
+
+    def text(self, start=0, stop=None):
+        """Rows start..stop-1 with all their decimals."""
+        if stop is None or stop > self.size:
+            stop = self.size
+        rows = []
+        for b in range(start/self.block, (stop - 1)/self.block + 1):
+            values = decode_exact(self._data(b))
+            lo = max(start - b*self.block, 0)
+            rows += [_row(y, self.decimals)
+                     for y in values[lo:stop - b*self.block]]
+        return rows
+
+def _rows(filename):
+    for l in open(filename):
+        if l.split():
+            yield l.split()[0]
+
+def pack(input_file, output, decimals=0, first=0, block=BLOCK):
+    """Write the table `input_file` (one zero per line) as a .rzt file.
+    `first` is only recorded in the header. With `decimals` the rows
+    are rounded to that many places, otherwise nothing is lost (this
+    costs a first pass over the file).
+
+    """
+    if not decimals:
+        decimals = max([_written(row) for row in _rows(input_file)] or [0])
+    out = open(output, 'wb')
+    # the header is written again at the end, when we know it
+    out.write('\0'*struct.calcsize(HEADER))
+    offsets = []
+    count = 0
+    values = []
+    for row in _rows(input_file):
+        values.append(_fixed(row, decimals))
+        count += 1
+        if len(values) == block:
+            offsets.append(out.tell())
+            out.write(encode(values, decimals))
+            values = []
+    if values:
+        offsets.append(out.tell())
+        out.write(encode(values, decimals))
+    offsets.append(out.tell())
+    out.write(numpy.array(offsets, dtype='<u8').tostring())
+    out.seek(0)
+    out.write(struct.pack(HEADER, MAGIC, first, count, decimals, block,
+                          len(offsets) - 1, offsets[-1]))
+    out.close()
+    return decimals
+
+def unpack(input_file, output):
+    """Write a .rzt table as text, one zero per line."""
+    table = Packed(input_file)
+    out = open(output, 'w')
+    for start in range(0, len(table), table.block):
+        for row in table.text(start, start + table.block):
+            out.write(row + '\n')
+    out.close()
@@ -14,6 +14,7 @@ from mpmath.libmp.libintmath import moebius
 from numpy import arange
 
 import zeros
+import zeroarray
 
 mp.dps = 20
 #pretty = True
@@ -67,14 +68,7 @@ def pi_true(x):
     return primepi(x)
 
 def single_pi(x, num_zeros, zeros_file):
-    f = open(zeros_file)
-    nzeros = []
-    i = 1
-    for l in f:
-        if i > num_zeros:
-            break
-        nzeros.append(mpf(l.strip()))
-        i += 1
+    nzeros = zeroarray.read(zeros_file, 1, num_zeros)
     return pi_zeros(x, nzeros), pi_true(x)
 
 def table_pi(xmax, step, zeros_file, num_zeros, output):
@@ -85,15 +79,8 @@ def table_pi(xmax, step, zeros_file, num_zeros, output):
     
     """
     o = open(output, 'w')
-    f = open(zeros_file)
-    nzeros = []
-    i = 1
-    for l in f:
-        if i > num_zeros:
-            break
-        nzeros.append(mpf(l.strip()))
-        i += 1
-    lambert = [zeros.zerow(i) for i in range(1, num_zeros+1)]
+    nzeros = zeroarray.read(zeros_file, 1, num_zeros)
+    lambert = list(zeros.zerow_array(range(1, num_zeros+1)))
     xvals = arange(2, xmax+step, step)
     for x in xvals:
         pit = pi_true(x)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+
+"""
+Count and time the calls to the expensive mpmath functions.
+
+Most of our time goes to a few mpmath functions (zeta for the solvers,
+ei and quad for the prime counting formula, log everywhere), but
+cProfile mixes them with the thousands of small mpmath internals, and
+doesn't tell which of our functions called them. Here we replace these
+functions by wrappers, in mpmath and in the namespaces of our modules
+(which mostly did `from mpmath import *`), and each wrapper records
+
+    - the number of calls and the time, for each pair of our calling
+      function and primitive, which gives the flat table;
+    - the time spent in the primitive itself (not in the primitives it
+      calls, as log inside the integrand of quad), for each stack of
+      our functions and primitives, in the collapsed format of
+      flamegraph.pl ("prime.table_pi;prime.j_zeros;quad;log 1234", in
+      microseconds), with the time outside the primitives as "python".
+
+It is opt-in: nothing is wrapped outside `profiled` or `start`, which
+the scripts call with --instrument (see `add_option`). The wrappers walk
+the stack at every call, so they are slow for cheap calls, and only the
+calls of this process are seen, so the pools should have one process
+(-p 1, -j 1 or RIEMANN_PROCESSES=1).
+
+"""
+
+import os
+import sys
+import time
+import atexit
+import contextlib
+
+import mpmath
+
+
+PRIMITIVES = ['zeta', 'ei', 'quad', 'lambertw', 'log', 'siegelz',
+              'siegeltheta', 'li']
+# our modules are the ones in the directory of lib and its parent
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _ours(filename):
+    return os.path.abspath(filename).startswith(ROOT + os.sep)
+
+def _module(frame):
+    name = frame.f_globals.get('__name__', '?')
+    if name == '__main__':
+        name = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+    return name.split('.')[-1]
+
+class Profile:
+    """The calls to `primitives` made while installed."""
+
+    def __init__(self, primitives=PRIMITIVES):
+        self.primitives = primitives
+        self.original = dict((name, getattr(mpmath, name))
+                             for name in primitives)
+        self.wrappers = dict((name, self._wrap(name, f))
+                             for name, f in self.original.items())
+        self.calls = {}
+        self.stacks = {}
+        self.children = []
+        self.inside = 0.0
+        self.elapsed = 0.0
+        self.start = None
+
+    def _wrap(self, name, f):
+        profile = self
+        def primitive(*args, **kwargs):
+            profile.children.append(0.0)
+            start = time.time()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                elapsed = time.time() - start
+                own = elapsed - profile.children.pop()
+                if profile.children:
+                    profile.children[-1] += elapsed
+                else:
+                    profile.inside += elapsed
+                profile._record(name, elapsed, own, sys._getframe(1))
+        primitive.__name__ = name
+        primitive.__doc__ = f.__doc__
+        return primitive
+
+    def _record(self, name, elapsed, own, frame):
+        stack = [name]
+        caller = None
+        while frame is not None:
+            code = frame.f_code
+            if code is self._code:
+                stack.append(frame.f_locals['name'])
+            elif _ours(code.co_filename):
+                label = '%s.%s' % (_module(frame), code.co_name)
+                stack.append(label)
+                if caller is None:
+                    caller = label
+            frame = frame.f_back
+        c = self.calls.setdefault((caller or '?', name), [0, 0.0])
+        c[0] += 1
+        c[1] += elapsed
+        stack = ';'.join(reversed(stack))
+        self.stacks[stack] = self.stacks.get(stack, 0.0) + own
+
+    @property
+    def _code(self):
+        return self.wrappers[self.primitives[0]].__code__
+
+    def _modules(self):
+        for module in sys.modules.values():
+            filename = getattr(module, '__file__', None)
+            if module is not None and filename and _ours(filename):
+                yield module
+
+    def _replace(self, old, new):
+        for name in self.primitives:
+            for module in [mpmath] + list(self._modules()):
+                if module.__dict__.get(name) is old[name]:
+                    setattr(module, name, new[name])
+
+    def install(self):
+        """Replace the primitives in mpmath and in our modules."""
+        self._replace(self.original, self.wrappers)
+        self.start = time.time()
+
+    def uninstall(self):
+        """Put the primitives back, also in the modules imported while
+        installed.
+
+        """
+        self.elapsed += time.time() - self.start
+        self._replace(self.wrappers, self.original)
+
+    def table(self):
+        """The flat profile: for each caller and primitive the number of
+        calls, the time and its percentage of the total, sorted by time.
+
+        """
+        total = self.elapsed or 1.0
+        lines = ['%-40s %-12s %10s %10s %6s' % ('#caller', 'primitive',
+                                                 'calls', 'time', '%')]
+        rows = sorted(self.calls.items(), key=lambda r: -r[1][1])
+        for (caller, name), (calls, t) in rows:
+            lines.append('%-40s %-12s %10i %10.3f %6.1f' %
+                         (caller, name, calls, t, 100.0*t/total))
+        lines.append('%-40s %-12s %10s %10.3f %6.1f' %
+                     ('total', 'primitives', '', self.inside,
+                      100.0*self.inside/total))
+        lines.append('%-40s %-12s %10s %10.3f %6.1f' %
+                     ('total', 'python', '', self.elapsed - self.inside,
+                      100.0*(self.elapsed - self.inside)/total))
+        return '\n'.join(lines) + '\n'
+
+    def write_stacks(self, filename):
+        """Write the collapsed stacks to `filename`, for flamegraph.pl."""
+        f = open(filename, 'w')
+        for stack, t in sorted(self.stacks.items()):
+            f.write('%s %i\n' % (stack, int(round(t*1e6))))
+        f.write('python %i\n' % int(round((self.elapsed - self.inside)*1e6)))
+        f.close()
+
+    def report(self, stacks='', output=None):
+        """Print the table to `output` (stderr by default) and write the
+        stacks to the file `stacks` if given.
+
+        """
+        (output or sys.stderr).write(self.table())
+        if stacks:
+            self.write_stacks(stacks)
+
+@contextlib.contextmanager
+def profiled(stacks='', output=None, primitives=PRIMITIVES):
+    """Profile the block, then report as `Profile.report`."""
+    profile = Profile(primitives)
+    profile.install()
+    try:
+        yield profile
+    finally:
+        profile.uninstall()
+        profile.report(stacks, output)
+
+def start(stacks=''):
+    """Profile until the program exits, then report as
+    `Profile.report`. This is what --instrument does in the scripts.
+
+    """
+    profile = Profile()
+    profile.install()
+    def stop():
+        profile.uninstall()
+        profile.report(stacks)
+    atexit.register(stop)
+    return profile
+
+def add_option(parser):
+    """Add --instrument to the optparse `parser` of a script."""
+    parser.add_option('--instrument', dest='instrument', action='store',
+                      default='', type='string', help="Count and time the "\
+                      "calls to zeta, ei, quad, lambertw, log and the "\
+                      "like, print a table of them at the end, and write "\
+                      "their stacks to this file for flamegraph.pl.")
+
+def from_options(options):
+    """`start` if --instrument was given."""
+    if options.instrument:
+        return start(options.instrument)
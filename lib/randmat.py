@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+
+"""
+Eigenvalues of random GUE matrices, to compare with the zeros.
+
+A GUE matrix of size n has the same eigenvalues as the tridiagonal
+matrix of Dumitriu and Edelman (beta = 2)
+
+    diagonal       N(0, 1),
+    off diagonal   chi_{2(n-1)}/sqrt(2), ..., chi_2/sqrt(2),
+
+which needs O(n) memory. Its density is the semicircle of radius
+2 sqrt(n), whose counting function unfolds the spectrum. We keep only
+the central part (the bulk), far from the edges where the statistics
+are different, and sample many matrices with a pool of processes.
+Matrix k of a run with seed s is generated from the seed (s, k), so the
+result does not depend on the number of processes.
+
+The unfolded spectra go through the same pair counting as the zeros
+(`unfold.pair_counts`), so we compare the zeros with GUE at finite n
+and not only with the limit 1 - (sin pi x/pi x)^2.
+
+"""
+
+import multiprocessing
+
+import numpy
+import scipy.linalg
+
+import unfold
+import formfactor
+
+
+SIZE = 2000
+FRACTION = 0.5
+GAP = 10.0 # between spectra when they are saved in one array
+
+def tridiagonal(n, rng):
+    """Diagonal and off diagonal of the Dumitriu-Edelman matrix."""
+    d = rng.normal(0.0, 1.0, n)
+    e = numpy.sqrt(rng.chisquare(2.0*numpy.arange(n-1, 0, -1))/2.0)
+    return d, e
+
+def eigenvalues(d, e):
+    """Sorted eigenvalues of the symmetric tridiagonal matrix (d, e)."""
+    if hasattr(scipy.linalg, 'eigvalsh_tridiagonal'): # scipy >= 1.0
+        return scipy.linalg.eigvalsh_tridiagonal(d, e)
+    band = numpy.vstack([d, numpy.append(e, 0.0)])
+    return numpy.sort(scipy.linalg.eigvals_banded(band, lower=True))
+
+def semicircle_count(x, n):
+    """Expected number of eigenvalues below x for a matrix of size n."""
+    x = numpy.clip(x, -2.0*numpy.sqrt(n), 2.0*numpy.sqrt(n))
+    return n/2.0 + (x*numpy.sqrt(4.0*n - x*x) +
+                    4.0*n*numpy.arcsin(x/2.0/numpy.sqrt(n)))/4.0/numpy.pi
+
+def spectrum(n=SIZE, seed=0, index=0, fraction=FRACTION):
+    """The central `fraction` of the unfolded spectrum of the matrix
+    `index` of the run `seed`.
+
+    """
+    rng = numpy.random.RandomState([seed, index])
+    w = eigenvalues(*tridiagonal(n, rng))
+    k = int(n*(1.0 - fraction)/2.0)
+    return semicircle_count(w[k:n-k], n)
+
+def _spectrum(args):
+    return spectrum(*args)
+
+def ensemble(total, n=SIZE, seed=0, fraction=FRACTION, processes=None):
+    """Unfolded spectra of as many matrices of size `n` as needed to
+    have `total` eigenvalues.
+
+    """
+    per_matrix = n - 2*int(n*(1.0 - fraction)/2.0)
+    matrices = int(numpy.ceil(float(total)/per_matrix))
+    jobs = [(n, seed, k, fraction) for k in range(matrices)]
+    if processes == 1:
+        return [_spectrum(j) for j in jobs]
+    pool = multiprocessing.Pool(processes)
+    try:
+        return pool.map(_spectrum, jobs, 1)
+    finally:
+        pool.close()
+        pool.join()
+
+def pair_correlation(spectra, alpha, step):
+    """Pair correlation on the bins [a, a+step) of the unfolded
+    spectra, normalized as in `gue2.main`. The pairs are counted inside
+    each matrix.
+
+    """
+    alphas = numpy.arange(alpha[0], alpha[1], step)
+    betas = alphas + step
+    counts = numpy.zeros(len(alphas))
+    points = 0
+    for x in spectra:
+        counts += unfold.pair_counts(x, alphas, betas)
+        points += len(x) - 1
+    return (alphas + betas)/2.0, counts/points/step
+
+def main(total, output_file, alpha=(0.0, 1.95), step=0.05, n=SIZE, seed=0,
+         processes=None):
+    """Write the table of the pair correlation of `total` eigenvalues,
+    with the same columns as `gue2.main`.
+
+    """
+    spectra = ensemble(total, n, seed, processes=processes)
+    centers, values = pair_correlation(spectra, alpha, step)
+    theory = [formfactor.gue_two_point(c - step/2.0, c + step/2.0)
+              for c in centers]
+    formfactor.write_table(output_file, centers, values, theory)
+    return spectra
+
+def save(filename, spectra):
+    """Save the spectra in one array for `gue.py -x`, each one starting
+    GAP after the end of the previous, so no pair crosses them.
+
+    """
+    x = []
+    offset = 0.0
+    for s in spectra:
+        x.append(s - s[0] + offset)
+        offset = x[-1][-1] + GAP
+    unfold.save(filename, numpy.concatenate(x))
+
+def points(count, lo, hi, seed=0):
+    """`count` consecutive eigenvalues from the bulk of one matrix,
+    moved to the interval [lo, hi], e.g. to be drawn with the zeros.
+
+    """
+    x = spectrum(4*count, seed, 0, 0.25)[:count]
+    return lo + (x - x[0])*(hi - lo)/(x[-1] - x[0])
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+"""
+Evaluate a function on a grid with a pool of processes.
+
+The curves of the graphs are f(*args, x) for every x of a grid, and
+each value is an independent zeta evaluation, so we split the grid in
+chunks and give them to a `multiprocessing.Pool`. The workers run with
+the same mp.dps as the caller.
+
+The number of processes is given by the environment variable
+RIEMANN_PROCESSES, by default the number of cores. Functions that
+cannot be pickled (lambdas, methods of mpmath contexts like mpmath.li)
+are evaluated serially.
+
+"""
+
+import os
+import pickle
+import multiprocessing
+
+import mpmath
+
+
+PROCESSES = int(os.environ.get('RIEMANN_PROCESSES', 0)) or None
+# below this number of points the pool costs more than it saves
+MIN_POINTS = 20
+
+def _init(dps):
+    mpmath.mp.dps = dps
+
+def _evaluate(job):
+    f, args, x = job
+    return f(*(args + (x,)))
+
+def _pair(job):
+    return job[2], _evaluate(job)
+
+def picklable(f):
+    try:
+        pickle.dumps(f)
+    except Exception:
+        return False
+    return True
+
+def sample(f, grid, args=(), processes=PROCESSES, chunksize=None,
+           ordered=True):
+    """Return the list f(*args, x) for every x in `grid`.
+
+    The grid is sent to the pool in chunks of `chunksize` points, by
+    default about four chunks per process. With `ordered=False` the
+    values come in the order they are computed, as (x, f(x)) pairs.
+
+    """
+    args = tuple(args)
+    grid = list(grid)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if processes <= 1 or len(grid) < MIN_POINTS or not picklable(f):
+        values = [f(*(args + (x,))) for x in grid]
+        if ordered:
+            return values
+        return zip(grid, values)
+    if chunksize is None:
+        chunksize = max(1, len(grid)/(4*processes))
+    jobs = [(f, args, x) for x in grid]
+    pool = multiprocessing.Pool(processes, _init, (mpmath.mp.dps,))
+    try:
+        if ordered:
+            values = list(pool.imap(_evaluate, jobs, chunksize))
+        else:
+            values = list(pool.imap_unordered(_pair, jobs, chunksize))
+    finally:
+        pool.close()
+        pool.join()
+    return values
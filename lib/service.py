@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+
+"""
+A local service that keeps the zero tables and the solver warm.
+
+Every call of genzeros.py, gue.py or prime_counting.py imports mpmath,
+reads its table and dies, which for the many small requests we make
+costs more than the computation. Here a long running server listens on
+a unix socket (RIEMANN_SOCKET, by default /tmp/riemann_zeta.sock) and
+gives the jobs to a `multiprocessing.Pool`, whose workers keep the
+tables they have read.
+
+A request is one line of JSON, and the answer is streamed back as one
+line of JSON per result, as soon as it is ready, ending with
+{"done": true} or {"error": message}. The jobs are
+
+    {"job": "zeros", "m": 1, "n": 100}
+        zeros m..n from the transcendental equation, one line
+        {"n": i, "zero": y, "mark": ""} each, in order;
+    {"job": "pi", "table": file, "zeros": 500, "x": [2, 2.5, ...]}
+        pi(x) from the first zeros of the table, one line
+        {"x": x, "pi": pi(x), "pi_zeros": ...} each;
+    {"job": "gue", "table": file, "m": m, "n": n, "first": 1,
+     "alpha": [0, 1.95], "step": 0.05, "method": "smooth"}
+        pair correlation of the zeros m..n, lines {"x", "value", "gue"};
+    {"job": "stats"} and {"job": "shutdown"}.
+
+The zeros are computed in chunks of CHUNK indexes, and every index
+being computed or already computed is registered, so two requests with
+the same or overlapping ranges share the work. The last MAX_ZEROS
+zeros and MAX_RESULTS other results are kept in memory.
+
+The front end is a threading SocketServer, one thread per connection;
+asyncio is not available in python 2.
+
+"""
+
+import os
+import json
+import socket
+import threading
+import collections
+import SocketServer
+import multiprocessing
+
+import numpy
+import mpmath
+
+import zeros
+import prime
+import tuning
+import tables
+import unfold
+import formfactor
+
+
+SOCKET = os.environ.get('RIEMANN_SOCKET', '/tmp/riemann_zeta.sock')
+CHUNK = 20
+MAX_ZEROS = 100000
+MAX_RESULTS = 10000
+
+# tables and unfolded zeros kept by each worker
+_memo = {}
+
+def _init(dps):
+    """Start a worker with the precision of the server."""
+    mpmath.mp.dps = dps
+
+def _remember(key, f, *args):
+    if key not in _memo:
+        _memo[key] = f(*args)
+    return _memo[key]
+
+def _zeros(m, n, profile):
+    bands = _remember(('profile', profile), tuning.load, profile)
+    rows = []
+    for i in range(m, n+1):
+        y, mark = zeros.goodzero(i, bands)
+        rows.append({'n': i, 'zero': float(y), 'mark': mark})
+    return rows
+
+def _first_zeros(filename, count):
+    return [float(y) for y in tables.Table(filename).read(0, count)]
+
+def _pi(x, filename, count):
+    zz = _remember(('table', filename, count), _first_zeros, filename, count)
+    return {'x': x, 'pi': float(prime.pi_true(x)),
+            'pi_zeros': float(prime.pi_zeros(x, zz))}
+
+def _gue(filename, m, n, first, alpha, step, method):
+    x = _remember(('unfold', filename, m, n, first, method),
+                  unfold.unfold_file, filename, '', m, n, first, method)
+    alphas = numpy.arange(alpha[0], alpha[1], step)
+    counts = unfold.pair_counts(x, alphas, alphas + step)
+    rows = []
+    for a, c in zip(alphas, counts):
+        rows.append({'x': a + step/2.0, 'value': c/float(len(x) - 1)/step,
+                     'gue': formfactor.gue_two_point(a, a + step)})
+    return rows
+
+def _get(result):
+    """result.get() for an AsyncResult waited by several threads, since
+    in python 2.7 it only wakes one of them.
+
+    """
+    while not result.ready():
+        result.wait(0.1)
+    return result.get()
+
+def _failed(result):
+    """True if `result` raised, so it must be submitted again."""
+    return result.ready() and not result.successful()
+
+class Service:
+    """The registry of the jobs given to the pool. `run` is called by
+    the threads of the server, so the registry is locked.
+
+    """
+
+    def __init__(self, processes=None, profile=''):
+        self.pool = multiprocessing.Pool(processes, _init,
+                                         (mpmath.mp.dps,))
+        self.profile = profile
+        self.lock = threading.Lock()
+        self.zeros = collections.OrderedDict() # n -> (result, offset)
+        self.results = collections.OrderedDict() # key -> result
+        self.submitted = 0
+        self.shared = 0
+
+    def _forget(self, registry, size):
+        """Drop the oldest finished results above `size`."""
+        for key in registry.keys():
+            if len(registry) <= size:
+                break
+            result = registry[key]
+            if isinstance(result, tuple):
+                result = result[0]
+            if result.ready():
+                del registry[key]
+
+    def submit(self, key, f, *args):
+        with self.lock:
+            if key in self.results and _failed(self.results[key]):
+                del self.results[key]
+            if key in self.results:
+                self.shared += 1
+                self.results[key] = self.results.pop(key)
+            else:
+                self.submitted += 1
+                self.results[key] = self.pool.apply_async(f, args)
+                self._forget(self.results, MAX_RESULTS)
+            return self.results[key]
+
+    def submit_zeros(self, m, n):
+        """Register the zeros m..n not yet registered, in chunks, and
+        return the list of (result, offset) of every index.
+
+        """
+        with self.lock:
+            chunks = []
+            for i in range(m, n+1):
+                if i in self.zeros and _failed(self.zeros[i][0]):
+                    del self.zeros[i]
+                if i in self.zeros:
+                    self.shared += 1
+                elif chunks and chunks[-1][1] == i - 1 and \
+                     i - chunks[-1][0] < CHUNK:
+                    chunks[-1][1] = i
+                else:
+                    chunks.append([i, i])
+            for a, b in chunks:
+                result = self.pool.apply_async(_zeros, (a, b, self.profile))
+                self.submitted += 1
+                for i in range(a, b+1):
+                    self.zeros[i] = (result, i - a)
+            found = [self.zeros[i] for i in range(m, n+1)]
+            self._forget(self.zeros, MAX_ZEROS)
+        return found
+
+    def run(self, job):
+        """Generate the lines of the answer to `job`."""
+        kind = job.get('job')
+        if kind == 'zeros':
+            for result, offset in self.submit_zeros(int(job['m']),
+                                                    int(job['n'])):
+                yield _get(result)[offset]
+        elif kind == 'pi':
+            count = int(job.get('zeros', 100))
+            results = [self.submit(('pi', job['table'], count, x), _pi, x,
+                                   job['table'], count) for x in job['x']]
+            for result in results:
+                yield _get(result)
+        elif kind == 'gue':
+            args = (job['table'], int(job['m']), int(job['n']),
+                    int(job.get('first', 1)),
+                    tuple(job.get('alpha', (0.0, 1.95))),
+                    float(job.get('step', 0.05)),
+                    job.get('method', 'smooth'))
+            for row in _get(self.submit(('gue',) + args, _gue, *args)):
+                yield row
+        elif kind == 'stats':
+            yield {'zeros': len(self.zeros), 'results': len(self.results),
+                   'submitted': self.submitted, 'shared': self.shared}
+        elif kind != 'shutdown':
+            raise ValueError('unknown job %s' % kind)
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+class _Handler(SocketServer.StreamRequestHandler):
+
+    def _send(self, row):
+        self.wfile.write(json.dumps(row) + '\n')
+        self.wfile.flush()
+
+    def handle(self):
+        try:
+            job = json.loads(self.rfile.readline())
+            for row in self.server.service.run(job):
+                self._send(row)
+            self._send({'done': True})
+        except Exception, error:
+            self._send({'error': '%s: %s' % (type(error).__name__, error)})
+            return
+        if job.get('job') == 'shutdown':
+            threading.Thread(target=self.server.shutdown).start()
+
+class _Server(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+    daemon_threads = True
+
+def serve(path=SOCKET, processes=None, profile=''):
+    """Run the service until a shutdown job arrives."""
+    if os.path.exists(path):
+        os.remove(path)
+    service = Service(processes, profile)
+    server = _Server(path, _Handler)
+    server.service = service
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.close()
+        if os.path.exists(path):
+            os.remove(path)
+
+def request(job, path=SOCKET):
+    """Send `job` (a dictionary) to the service and generate the results
+    as they arrive.
+
+    """
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    s.connect(path)
+    try:
+        s.sendall(json.dumps(job) + '\n')
+        for line in s.makefile():
+            row = json.loads(line)
+            if 'error' in row:
+                raise RuntimeError(row['error'])
+            if row.get('done'):
+                break
+            yield row
+    finally:
+        s.close()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+"""
+Zeta on a grid of points sigma + i t, off the critical line.
+
+`transeqe`, `argzetae`, `theta(x, y)` and `xhalf` of the module `zeros`
+evaluate zeta with mpmath one point at a time. For the graphs we need
+them on many sigma and t, and double precision is enough, so here zeta
+is computed with Euler-Maclaurin,
+
+    zeta(s) = sum_{n<N} n^-s + N^(1-s)/(s-1) + N^-s/2
+              + sum_{k=1}^{K} B_2k/(2k)! s(s+1)...(s+2k-2) N^(-s-2k+1),
+
+where the partial sum for all the points is one matrix product
+
+    exp(-i t_j log n) n^(-sigma_k),
+
+so the powers n^-sigma are shared by every t and the phases by every
+sigma. With N > |t| the terms of the correction decrease like
+(|s|/2 pi N)^2k and K = 8 gives about 11 digits. This also works for
+sigma < 1/2, needed by `xhalf`, where the Riemann-Siegel formula does
+not apply.
+
+The result is a `Sweep`, which gives the functions of `zeros` as arrays
+of shape (len(t), len(sigma)) and can be saved as a .npz file.
+
+"""
+
+import numpy
+
+
+# B_2, B_4, ..., B_20
+BERNOULLI = [1.0/6, -1.0/30, 1.0/42, -1.0/30, 5.0/66, -691.0/2730, 7.0/6,
+             -3617.0/510, 43867.0/798, -174611.0/330]
+
+def zeta_grid(sigma, t, terms=0, order=8):
+    """zeta(sigma_k + i t_j) as an array of shape (len(t), len(sigma)).
+    `terms` is N, by default max |t| + 20.
+
+    """
+    sigma = numpy.atleast_1d(numpy.asarray(sigma, dtype=numpy.float64))
+    t = numpy.atleast_1d(numpy.asarray(t, dtype=numpy.float64))
+    N = terms or int(numpy.abs(t).max()) + 20
+    logn = numpy.log(numpy.arange(1, N))
+    amplitude = numpy.exp(-numpy.outer(logn, sigma)).astype(numpy.complex128)
+    values = numpy.empty((len(t), len(sigma)), dtype=numpy.complex128)
+    # rows of t per product, so the phases take about 32Mb
+    block = max(1, (1 << 21)/len(logn))
+    for i in range(0, len(t), block):
+        phase = numpy.exp(-1j*numpy.outer(t[i:i+block], logn))
+        values[i:i+block] = numpy.dot(phase, amplitude)
+    s = sigma[numpy.newaxis, :] + 1j*t[:, numpy.newaxis]
+    power = numpy.exp(-s*numpy.log(N)) # N^-s
+    values += N*power/(s - 1.0) + power/2.0
+    rising = s
+    power = power/N
+    factorial = 2.0
+    for k in range(1, order+1):
+        values += BERNOULLI[k-1]/factorial*rising*power
+        rising = rising*(s + 2*k - 1)*(s + 2*k)
+        power = power/N/N
+        factorial *= (2*k + 1)*(2*k + 2)
+    return values
+
+class Sweep:
+    """Zeta on the grid sigma x t. `mirror` has the values at 1 - sigma,
+    only needed by `xhalf`.
+
+    """
+
+    def __init__(self, sigma, t, values, mirror=None):
+        self.sigma = numpy.asarray(sigma, dtype=numpy.float64)
+        self.t = numpy.asarray(t, dtype=numpy.float64)
+        self.values = values
+        self.mirror = mirror
+
+    def _smooth(self):
+        t = self.t[:, numpy.newaxis]
+        return t/2.0*numpy.log(t/2.0/numpy.pi/numpy.e)
+
+    def arg(self):
+        """arg zeta(sigma + i t)/pi, as `zeros.argzetae`."""
+        return numpy.angle(self.values)/numpy.pi
+
+    def theta(self):
+        """As `zeros.theta(sigma, t)`."""
+        return self._smooth() + numpy.pi/4.0*(self.sigma - 1.0) + \
+               numpy.angle(self.values)
+
+    def transeqe(self, n):
+        """As `zeros.transeqe(n, sigma - 1/2, t)`."""
+        return self._smooth()/numpy.pi + 11.0/8.0 - n + self.arg()
+
+    def xhalf(self):
+        """As `zeros.xhalf(t, sigma)`."""
+        if self.mirror is None:
+            raise ValueError('sweep made without mirror=True')
+        return 2.0/numpy.pi*numpy.angle(self.mirror/self.values)
+
+    def save(self, filename):
+        arrays = dict(sigma=self.sigma, t=self.t, values=self.values)
+        if self.mirror is not None:
+            arrays['mirror'] = self.mirror
+        numpy.savez_compressed(filename, **arrays)
+
+def sweep(sigma, t, mirror=False, terms=0, order=8):
+    """Evaluate zeta on the grid. With `mirror` zeta is also computed at
+    1 - sigma, in the same matrix product.
+
+    """
+    sigma = numpy.atleast_1d(numpy.asarray(sigma, dtype=numpy.float64))
+    t = numpy.atleast_1d(numpy.asarray(t, dtype=numpy.float64))
+    if not mirror:
+        return Sweep(sigma, t, zeta_grid(sigma, t, terms, order))
+    values = zeta_grid(numpy.concatenate([sigma, 1.0 - sigma]), t, terms,
+                       order)
+    return Sweep(sigma, t, values[:, :len(sigma)], values[:, len(sigma):])
+
+def load(filename):
+    data = numpy.load(filename)
+    mirror = data['mirror'] if 'mirror' in data.files else None
+    return Sweep(data['sigma'], data['t'], data['values'], mirror)
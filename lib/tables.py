@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+
+"""
+Random access to tables of zeros too large to be read in memory.
+
+A table is either a text file with one zero per line (other columns
+are ignored), a binary file of float64 values (.bin, or .npy which is
+memory mapped) or a compressed table (.rzt, see `packed`). In a binary file, or a text file where all the lines
+have the same width, like truezeros_around109.txt, the row i is at a
+known offset and we just seek there. For other text files, whose
+lines grow with the height, we stream the file once and keep the offset
+of every `STRIDE` lines, so a row costs at most STRIDE lines read.
+
+Rows are counted from 0, the first line of the file.
+
+"""
+
+import os
+
+import numpy
+
+import zeros
+import packed
+
+
+STRIDE = 1000
+# interior lines checked before taking a text file as fixed width
+SAMPLE = 64
+# good significant digits of a zero found in double precision: what a
+# double has, less what the solver loses
+SIGNIFICANT = 13
+
+def double_digits(y):
+    """Good decimal places of a zero found in double precision at the
+    height y.
+
+    """
+    return max(0, SIGNIFICANT - len(str(int(abs(float(y))))))
+
+def row_digits(row):
+    """Correct decimal places of a zero written as `row`. A row with
+    more than 17 decimals that is exactly a double, like our %.20f
+    tables, only has the digits of `double_digits`.
+
+    """
+    row = row.strip()
+    written = len(row.split('.')[1]) if '.' in row else 0
+    y = float(row)
+    if written > 17 and ('%.*f' % (written, y)) == row:
+        return min(written, double_digits(y))
+    return written
+
+def table_digits(rows):
+    """Correct decimal places of a table, from its first and last 100
+    rows, since the doubles lose decimals as the zeros grow. `rows` is
+    a list of strings or a `Table`.
+
+    """
+    if isinstance(rows, Table):
+        sample = rows.text(0, min(100, len(rows))) + \
+                 rows.text(max(len(rows) - 100, 0))
+    else:
+        sample = rows[:100] + rows[-100:]
+    return min([row_digits(r) for r in sample])
+
+class Table:
+    """A table of zeros in `filename`."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.width = 0
+        self.offsets = None
+        if filename.endswith('.npy'):
+            self.kind = 'npy'
+            self.data = numpy.load(filename, mmap_mode='r')
+            self.size = len(self.data)
+        elif filename.endswith('.bin'):
+            self.kind = 'bin'
+            self.data = numpy.memmap(filename, dtype='<f8', mode='r')
+            self.size = len(self.data)
+        elif filename.endswith('.rzt'):
+            self.kind = 'packed'
+            self.data = packed.Packed(filename)
+            self.size = len(self.data)
+        else:
+            self.kind = 'text'
+            self._index_text()
+
+    def _index_text(self):
+        total = os.path.getsize(self.filename)
+        f = open(self.filename, 'rb')
+        first = f.readline()
+        f.seek(max(0, total - len(first)))
+        last = f.read()
+        f.close()
+        if first and len(last) == len(first) and total % len(first) == 0 \
+           and last.count('\n') == 1 and last.endswith('\n') and \
+           self._fixed(len(first), total/len(first)):
+            # same width for the first, the last and a sample of the
+            # other lines, we check the rest as we read them
+            self.width = len(first)
+            self.size = total/self.width
+            return
+        self._index_offsets()
+
+    def _fixed(self, width, size):
+        """True if a sample of the lines has this `width`."""
+        f = open(self.filename, 'rb')
+        sample = numpy.linspace(1, size - 1, SAMPLE).astype(int)
+        for i in numpy.unique(sample[sample > 0]):
+            f.seek(i*width - 1)
+            l = f.read(width + 1)
+            if l.count('\n') != 2 or not l.startswith('\n') or \
+               not l.endswith('\n'):
+                f.close()
+                return False
+        f.close()
+        return True
+
+    def _index_offsets(self):
+        """Offset of every STRIDE lines."""
+        self.width = 0
+        self.offsets = []
+        f = open(self.filename, 'rb')
+        offset = 0
+        size = 0
+        for l in f:
+            if size % STRIDE == 0:
+                self.offsets.append(offset)
+            offset += len(l)
+            size += 1
+        f.close()
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def _line(self, f, i):
+        if self.width:
+            f.seek(max(i*self.width - 1, 0))
+            l = f.read(self.width + (i > 0))
+            if l.endswith('\n') and (i == 0 or l.startswith('\n')) and \
+               l.count('\n') == 1 + (i > 0):
+                return l[i > 0:]
+            # not fixed width after all
+            self._index_offsets()
+        f.seek(self.offsets[i/STRIDE])
+        for j in range(i % STRIDE):
+            f.readline()
+        return f.readline()
+
+    def rows(self, indexes):
+        """The zeros of the rows `indexes`, as a float64 array."""
+        indexes = numpy.asarray(indexes, dtype=numpy.int64)
+        if self.kind != 'text':
+            return numpy.asarray(self.data[indexes], dtype=numpy.float64)
+        values = numpy.empty(len(indexes))
+        f = open(self.filename, 'rb')
+        for k, i in enumerate(indexes):
+            values[k] = float(self._line(f, i).split()[0])
+        f.close()
+        return values
+
+    def read(self, start=0, stop=None, step=1):
+        """Rows start, start+step, ... below `stop`."""
+        if stop is None or stop > self.size:
+            stop = self.size
+        if self.kind != 'text' or step >= STRIDE or self.width:
+            return self.rows(numpy.arange(start, stop, step))
+        return numpy.concatenate([b[(start - k) % step::step] for k, b in
+                                  self._blocks(start, stop, STRIDE)] or
+                                 [numpy.empty(0)])
+
+    def _open(self, start):
+        """The file, positioned at the row `start`."""
+        f = open(self.filename, 'rb')
+        if self.width:
+            f.seek(start*self.width)
+        else:
+            f.seek(self.offsets[start/STRIDE])
+            for j in range(start % STRIDE):
+                f.readline()
+        return f
+
+    def _blocks(self, start, stop, size):
+        """Stream (first row, values) of consecutive rows."""
+        f = self._open(start)
+        i = start
+        while i < stop:
+            n = min(size, stop - i)
+            block = numpy.empty(n)
+            for k in range(n):
+                block[k] = float(f.readline().split()[0])
+            yield i, block
+            i += n
+        f.close()
+
+    def blocks(self, start=0, stop=None, size=100000):
+        """Iterate over (first row, values) of consecutive rows, never
+        having more than `size` of them in memory.
+
+        """
+        if stop is None or stop > self.size:
+            stop = self.size
+        if self.kind != 'text':
+            for i in range(start, stop, size):
+                yield i, numpy.asarray(self.data[i:min(i+size, stop)],
+                                       dtype=numpy.float64)
+            return
+        for b in self._blocks(start, stop, size):
+            yield b
+
+    def text(self, start=0, stop=None):
+        """Rows start..stop-1 as strings, with all the digits of the
+        file.
+
+        """
+        if stop is None or stop > self.size:
+            stop = self.size
+        if self.kind == 'packed':
+            return self.data.text(start, stop)
+        if self.kind != 'text':
+            return [repr(float(v)) for v in self.data[start:stop]]
+        f = self._open(start)
+        rows = [f.readline().split()[0] for i in range(start, stop)]
+        f.close()
+        return rows
+
+def decimate(m, n, jump):
+    """Indexes m, m+jump-1, m+2*jump-1, ... up to n, i.e. the first one
+    and every `jump`-th, as plotted by graphs.Zeros.
+
+    """
+    return numpy.concatenate([[m], numpy.arange(m+jump-1, n+1, jump)]) \
+           if jump > 1 else numpy.arange(m, n+1)
+
+def envelope(table, m, n, bins=1000, first=1):
+    """Min/max envelope of the residual y_n - zerow(n), n = m..n,
+    in `bins` bins. The zero of index `first` is the first row of
+    `table`. Return the arrays (center of bin, min, max).
+
+    The table is streamed, so this works for any number of zeros.
+
+    """
+    if not isinstance(table, Table):
+        table = Table(table)
+    size = max(1, int(numpy.ceil(float(n - m + 1)/bins)))
+    centers, low, high = [], [], []
+    for i, y in table.blocks(m - first, n - first + 1, size*100):
+        index = numpy.arange(i, i + len(y)) + first
+        residual = y - zeros.zerow_array(index)
+        for k in range(0, len(y), size):
+            r = residual[k:k+size]
+            centers.append(index[k:k+size].mean())
+            low.append(r.min())
+            high.append(r.max())
+    return numpy.array(centers), numpy.array(low), numpy.array(high)
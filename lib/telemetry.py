@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+"""
+Instrumentation for the zero finding routines in `zeros`.
+
+For every zero we record how many times the transcendental equation was
+evaluated (each evaluation is one zeta call), how many times the bracket
+had to be expanded, the wall time, which branch of the solver was taken
+and the final residual |Z(y)| of the Hardy function at the solution.
+
+The records are written one per line in a tab separated log with columns
+
+    n, branch, evaluations, expansions, time, residual
+
+and `summary` aggregates such a log, optionally grouping the indexes
+in bands, so we can see where the solver spends its time.
+
+"""
+
+import time
+
+from mpmath import siegelz
+
+
+BRANCHES = ['normal', 'smoothed', 'raised', 'lowered', 'unresolved']
+HEADER = '#n\tbranch\tevaluations\texpansions\ttime\tresidual\n'
+
+class SolverStats:
+    """Statistics collected while solving for the n-th zero.
+
+    The branches are:
+
+        normal -> Brent around the Lambert approximation was good
+        smoothed -> the smoothed equation found an interval with
+                    alternating signs in the true equation
+        raised, lowered -> the curve had to be raised or lowered to
+                           find the hidden root (close pairs)
+        unresolved -> no good zero, only an approximation
+
+    When `enabled` is False nothing is recorded, so the solvers can
+    always use the same code path.
+
+    """
+
+    def __init__(self, n, enabled=True):
+        self.n = n
+        self.enabled = enabled
+        self.evaluations = 0
+        self.expansions = 0
+        self.branch = ''
+        self.residual = 0.0
+        self.time = 0.0
+        self.start = time.time()
+
+    def counted(self, f):
+        """Wrap `f` such that every call is counted as one evaluation."""
+        if not self.enabled:
+            return f
+        def g(*args):
+            self.evaluations += 1
+            return f(*args)
+        return g
+
+    def expand(self):
+        self.expansions += 1
+
+    def finish(self, branch, y):
+        """Close the record with the solution `y`. The transcendental
+        equation jumps at a zero, so its value is useless as a residual;
+        we use |Z(y)| instead, which vanishes at a true zero.
+
+        """
+        if not self.enabled:
+            return
+        self.branch = branch
+        self.time = time.time() - self.start
+        self.residual = abs(float(siegelz(y)))
+
+    def record(self):
+        """One line of the log."""
+        return '%i\t%s\t%i\t%i\t%.6f\t%.3e\n' % (self.n, self.branch,
+                    self.evaluations, self.expansions, self.time,
+                    self.residual)
+
+def read_log(filename):
+    """Return a list of tuples (n, branch, evaluations, expansions, time,
+    residual) from a log written by the solvers.
+
+    """
+    records = []
+    for l in open(filename):
+        if l.startswith('#') or not l.strip():
+            continue
+        n, branch, evals, expans, t, res = l.strip().split('\t')
+        records.append((int(n), branch, int(evals), int(expans), float(t),
+                        float(res)))
+    return records
+
+def _aggregate(records):
+    """Count, mean evaluations, mean expansions and total time."""
+    m = len(records)
+    evals = sum([r[2] for r in records])
+    expans = sum([r[3] for r in records])
+    t = sum([r[4] for r in records])
+    return m, float(evals)/m, float(expans)/m, t
+
+def summary(filename, band=0, slowest=5):
+    """Aggregate the log in `filename` and return a printable table.
+    If `band` is given the indexes are also grouped in bands of this
+    size, which is what we need to tune `epsilon` and `step` per
+    height.
+
+    """
+    records = read_log(filename)
+    if not records:
+        return 'No records in %s\n' % filename
+    lines = []
+    m, evals, expans, t = _aggregate(records)
+    lines.append('zeros: %i, time: %.2f s, %.4f s/zero, '\
+                 'evaluations/zero: %.2f, expansions/zero: %.2f' % \
+                 (m, t, t/m, evals, expans))
+    lines.append('')
+    lines.append('branch\t\tzeros\tevals/zero\texpans/zero\ttime/zero')
+    for branch in BRANCHES:
+        rs = [r for r in records if r[1] == branch]
+        if not rs:
+            continue
+        m, evals, expans, t = _aggregate(rs)
+        lines.append('%-10s\t%i\t%.2f\t\t%.2f\t\t%.4f' % \
+                     (branch, m, evals, expans, t/m))
+    if band:
+        lines.append('')
+        lines.append('band\t\t\tzeros\tevals/zero\ttime/zero\tunresolved')
+        bands = {}
+        for r in records:
+            bands.setdefault((r[0]-1)//band, []).append(r)
+        for b in sorted(bands):
+            rs = bands[b]
+            m, evals, expans, t = _aggregate(rs)
+            bad = len([r for r in rs if r[1] == 'unresolved'])
+            lines.append('%i-%i\t%i\t%.2f\t\t%.4f\t\t%i' % \
+                         (b*band+1, (b+1)*band, m, evals, t/m, bad))
+    if slowest:
+        lines.append('')
+        lines.append('slowest zeros:')
+        rs = sorted(records, key=lambda r: r[4], reverse=True)[:slowest]
+        for r in rs:
+            lines.append('n=%i\t%s\t%i evals\t%.4f s\tresidual %.3e' % \
+                         (r[0], r[1], r[2], r[4], r[5]))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+
+"""
+Tuning of the parameters of `zeros.findzero3` per height band.
+
+The parameters `epsilon`, `step`, `incr` and `step_max` of `findzero3`
+have to be adapted to the height: the values used until 10^5 are not
+good around 10^9 (see data/final_zeros_109/README). Here we sample some
+indexes of a band, solve them with each candidate set of parameters,
+compare with a reference table and keep the set with the best success
+rate, and the fewest evaluations of the equation among those.
+
+The result is a profile, a tab separated text file with one band per
+line
+
+    n_max    epsilon    step    incr    step_max
+
+The parameters of a line are used for the indexes n <= n_max which are
+above the previous line. The last line is also used above its n_max.
+`zeros.goodzeros` reads this file automatically.
+
+"""
+
+import os
+import random
+import itertools
+
+import zeros
+import telemetry
+
+
+PROFILE = 'findzero3.profile'
+# what goodzeros used before having profiles
+DEFAULT = {'epsilon': 1.0/150.0, 'step': 0.01, 'incr': 0.01,
+           'step_max': 1.2}
+PARAMETERS = ['epsilon', 'step', 'incr', 'step_max']
+
+def candidates(epsilons=(1.0/150.0, 1.0/50.0, 1.0/30.0, 1.0/10.0),
+               steps=(0.001, 0.01), steps_max=(0.1, 0.2, 1.2)):
+    """The grid of parameters we try. The increment is the same as
+    the initial step, as in all the cases documented in `findzero3`.
+
+    """
+    return [{'epsilon': e, 'step': s, 'incr': s, 'step_max': m}
+            for e, s, m in itertools.product(epsilons, steps, steps_max)
+            if m > s]
+
+def read_profile(filename):
+    """Return a sorted list of (n_max, parameters)."""
+    profile = []
+    for l in open(filename):
+        if l.startswith('#') or not l.strip():
+            continue
+        cols = l.strip().split('\t')
+        params = dict(zip(PARAMETERS, [float(x) for x in cols[1:5]]))
+        profile.append((int(cols[0]), params))
+    profile.sort()
+    return profile
+
+def write_profile(filename, n_max, params, comment=''):
+    """Add the band ending at `n_max` to the profile in `filename`,
+    replacing a previous line for the same band.
+
+    """
+    profile = []
+    comments = {}
+    if os.path.exists(filename):
+        profile = [p for p in read_profile(filename) if p[0] != n_max]
+        for l in open(filename):
+            key = l[1:].split('\t')[0]
+            if l.startswith('#') and key.isdigit():
+                comments[int(key)] = l
+    profile.append((n_max, params))
+    profile.sort()
+    if comment:
+        comments[n_max] = '#%i\t%s\n' % (n_max, comment)
+    o = open(filename, 'w')
+    o.write('#n_max\t%s\n' % '\t'.join(PARAMETERS))
+    for n, p in profile:
+        if n in comments:
+            o.write(comments[n])
+        o.write('%i\t%s\n' % (n, '\t'.join(['%.10g' % p[k]
+                                             for k in PARAMETERS])))
+    o.close()
+
+def parameters(profile, n):
+    """The parameters of `findzero3` for the index `n`."""
+    if not profile:
+        return DEFAULT
+    for n_max, params in profile:
+        if n <= n_max:
+            return params
+    return profile[-1][1]
+
+def load(filename=''):
+    """Load the profile in `filename`, or the one in the current
+    directory if it exists. Return an empty profile otherwise, which
+    means the default parameters.
+
+    """
+    if not filename and os.path.exists(PROFILE):
+        filename = PROFILE
+    if not filename:
+        return []
+    return read_profile(filename)
+
+def reference_zeros(filename, indexes, first_index=1):
+    """Read only the lines of the reference table for `indexes`."""
+    wanted = set(indexes)
+    last = max(wanted)
+    ref = {}
+    for i, l in enumerate(open(filename)):
+        n = i + first_index
+        if n in wanted:
+            ref[n] = float(l.strip().split()[0])
+        if n >= last:
+            break
+    return ref
+
+def _solve(n, params, stats):
+    """Solve with `findzero3` and choose the value as `goodzeros`."""
+    z, zz = zeros.findzero3(n, stats=stats, **params)
+    if z > 1:
+        return z
+    return zz
+
+def tune(n1, n2, reference, first_index=1, samples=20, digits=6, seed=0,
+         grid=None, verbose=True):
+    """Sample `samples` indexes between `n1` and `n2` and solve them
+    with every candidate in `grid`. A zero is a success when it agrees
+    with the table `reference` (whose first line is the zero
+    `first_index`) to `digits` decimal places.
+
+    The normal case does not depend on the parameters, so the indexes
+    solved in the normal branch by the first candidate are not solved
+    again, we only reuse their counts.
+
+    Return the list of (success rate, evaluations per zero, parameters)
+    sorted from the best to the worst.
+
+    """
+    if grid is None:
+        grid = candidates()
+    rng = random.Random(seed)
+    indexes = sorted(rng.sample(xrange(n1, n2+1), min(samples, n2-n1+1)))
+    ref = reference_zeros(reference, indexes, first_index)
+    indexes = [n for n in indexes if n in ref]
+    normal = {}
+    results = []
+    for params in grid:
+        good = 0
+        evaluations = 0
+        for n in indexes:
+            if n in normal:
+                y, evals = normal[n]
+            else:
+                stats = telemetry.SolverStats(n)
+                y = _solve(n, params, stats)
+                evals = stats.evaluations
+                if stats.branch == 'normal':
+                    normal[n] = (y, evals)
+            evaluations += evals
+            if abs(y - ref[n]) < 10.0**(-digits):
+                good += 1
+        rate = float(good)/len(indexes)
+        cost = float(evaluations)/len(indexes)
+        results.append((rate, cost, params))
+        if verbose:
+            print 'epsilon=%.5f step=%.3f step_max=%.2f: '\
+                  'success %.3f, evaluations/zero %.2f' % \
+                  (params['epsilon'], params['step'], params['step_max'],
+                   rate, cost)
+    results.sort(key=lambda r: (-r[0], r[1]))
+    return results
+
+def autotune(n1, n2, reference, profile=PROFILE, first_index=1, samples=20,
+             digits=6, seed=0, grid=None, verbose=True):
+    """Tune the band n1..n2 and write the best parameters in `profile`."""
+    results = tune(n1, n2, reference, first_index, samples, digits, seed,
+                   grid, verbose)
+    rate, cost, params = results[0]
+    comment = 'band %i-%i, %i samples, success %.3f, evaluations/zero %.2f' \
+              % (n1, n2, samples, rate, cost)
+    write_profile(profile, n2, params, comment)
+    return results[0]
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+"""
+Unfolding of the zeros, done once for all the statistics.
+
+The density of zeros grows like log(t/2pi)/2pi, so before comparing
+spacings with GUE the heights t_n are mapped to x_n with mean spacing 1.
+We have three ways of doing it:
+
+    smooth  x_n = N0(t_n), the smooth part of the counting function
+            N0(t) = theta(t)/pi + 1;
+    local   each spacing is multiplied by the density at its left
+            zero, log(t_n/2pi)/2pi, as `gue2.delta_n`;
+    window  each spacing is multiplied by the mean density of N0 in its
+            block of `window` consecutive zeros, or in the whole table
+            if `window` is 0, like `gue1.bound` which uses one density
+            for all the zeros.
+
+The unfolded zeros are saved as a float64 .npy file relative to the
+first one (x_0 = 0), since only differences matter, so a table around
+10^12 keeps all its digits. All the pair counts then are binary searches
+on this array, without any log per pair.
+
+"""
+
+import numpy
+
+import tables
+
+
+METHODS = ['smooth', 'local', 'window']
+
+def smooth_difference(t0, d):
+    """N0(t0 + d) - N0(t0), accurate even when d is much smaller than t0.
+    `d` may be an array.
+
+    """
+    d = numpy.asarray(d, dtype=numpy.float64)
+    t0 = float(t0)
+    t = t0 + d
+    main = (d*(numpy.log(t0/2.0/numpy.pi) - 1.0) +
+            t*numpy.log1p(d/t0))/2.0/numpy.pi
+    return main + (1.0/t - 1.0/t0)/48.0/numpy.pi
+
+def unfold(heights, method='smooth', window=0, base=0.0):
+    """Unfold the sorted array `heights`. The zeros are base + heights,
+    so tables of differences like zeros_1012/zeros3 can be used without
+    loosing precision.
+
+    """
+    t = numpy.asarray(heights, dtype=numpy.float64)
+    spacings = numpy.diff(t)
+    if method == 'smooth':
+        return smooth_difference(base + t[0], t - t[0])
+    elif method == 'local':
+        density = numpy.log((base + t[:-1])/2.0/numpy.pi)/2.0/numpy.pi
+    elif method == 'window':
+        size = window or len(t)
+        density = numpy.empty(len(spacings))
+        for s in range(0, len(spacings), size):
+            e = min(s + size, len(t) - 1)
+            counted = smooth_difference(base + t[s], t[e] - t[s])
+            density[s:e] = counted/(t[e] - t[s])
+    else:
+        raise ValueError('unknown unfolding method %s' % method)
+    return numpy.concatenate([[0.0], numpy.cumsum(density*spacings)])
+
+def unfold_file(input_file, output, m, n, first=1, method='smooth',
+                window=0, base=0.0):
+    """Unfold the zeros m..n of `input_file`, whose first line is the
+    zero `first`, and save them in `output` (.npy) if given.
+
+    """
+    heights = tables.Table(input_file).read(m - first, n - first + 1)
+    x = unfold(heights, method, window, base)
+    if output:
+        save(output, x)
+    return x
+
+def save(filename, x):
+    numpy.save(filename, numpy.asarray(x, dtype=numpy.float64))
+
+def load(filename):
+    return numpy.load(filename)
+
+def pair_counts(x, alphas, betas):
+    """Number of pairs i < j with alpha < x_j - x_i <= beta, for every
+    bin (alpha, beta) of the sorted unfolded zeros `x`.
+
+    """
+    x = numpy.asarray(x, dtype=numpy.float64)
+    after = numpy.arange(1, len(x) + 1)
+    counts = []
+    for a, b in zip(alphas, betas):
+        lo = numpy.maximum(numpy.searchsorted(x, x + a, side='right'), after)
+        hi = numpy.searchsorted(x, x + b, side='right')
+        counts.append(int(numpy.maximum(hi - lo, 0).sum()))
+    return counts
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+
+"""
+Compact arrays of zeros.
+
+The readers used to build Python lists of mpf, which cost more than
+100 bytes per zero (the mpf, its tuple and its long), so 10^6 zeros
+took over 100 MB. A `ZeroArray` keeps the heights as a float64 array,
+8 bytes per zero, and when the digits beyond double precision matter it
+also keeps them exactly as fixed point int64 limbs: the integer part and
+the decimals in limbs of LIMB digits, so 20 decimals take 3 int64.
+
+It behaves like a sequence of heights (floats, or mpf from the limbs
+with `exact`), slices to another ZeroArray without copying (a slice
+with a step gives the plain heights, as its rows are not consecutive
+zeros), and numpy sees the float64 heights, so it can be passed to any
+function taking a list or an array of zeros.
+
+"""
+
+import numpy
+from mpmath import mpf
+
+import tables
+import packed
+
+
+LIMB = 18
+
+class ZeroArray:
+    """The zeros with indexes first, first+1, ... as float64 heights,
+    with `decimals` exact decimal places in `limbs` if it is not None.
+
+    """
+
+    def __init__(self, heights, first=1, limbs=None, decimals=0):
+        self.heights = numpy.asarray(heights, dtype=numpy.float64)
+        self.first = first
+        self.limbs = limbs
+        self.decimals = decimals
+
+    def __len__(self):
+        return len(self.heights)
+
+    def __array__(self, dtype=None):
+        if dtype is None:
+            return self.heights
+        return self.heights.astype(dtype)
+
+    def __iter__(self):
+        return iter(self.heights)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                # the rows are no longer consecutive zeros
+                return self.heights[key]
+            limbs = None if self.limbs is None else self.limbs[key]
+            return ZeroArray(self.heights[key], self.first + start, limbs,
+                             self.decimals)
+        return self.heights[key]
+
+    @property
+    def last(self):
+        return self.first + len(self) - 1
+
+    @property
+    def nbytes(self):
+        limbs = 0 if self.limbs is None else self.limbs.nbytes
+        return self.heights.nbytes + limbs
+
+    def _fixed(self, i):
+        """Row i as the integer y*10^decimals."""
+        row = self.limbs[i]
+        y = int(row[0])
+        for limb in row[1:]:
+            y = y*10**LIMB + int(limb)
+        return y/10**(LIMB*(len(row) - 1) - self.decimals)
+
+    def row(self, i):
+        """Row i as a string, with all the digits kept."""
+        if self.limbs is None:
+            return repr(float(self.heights[i]))
+        return packed._row(self._fixed(i), self.decimals)
+
+    def exact(self, i):
+        """Row i as an mpf, at the current precision."""
+        return mpf(self.row(i))
+
+    def tolist(self):
+        """The zeros as a list of mpf, as the old readers returned."""
+        return [self.exact(i) for i in range(len(self))]
+
+    def search(self, t):
+        """Number of zeros <= t, for a number or an array."""
+        return numpy.searchsorted(self.heights, t, side='right')
+
+    def index_above(self, t):
+        """Index of the first zero above `t`."""
+        return self.first + self.search(t)
+
+    def window(self, t1, t2):
+        """The zeros in [t1, t2]."""
+        return self[numpy.searchsorted(self.heights, t1, side='left'):
+                    self.search(t2)]
+
+    def at(self, n):
+        """Height of the zeros with index `n`."""
+        n = numpy.asarray(n)
+        if n.size and (n.min() < self.first or n.max() > self.last):
+            raise IndexError('the array has the zeros %i..%i' %
+                             (self.first, self.last))
+        return self.heights[n - self.first]
+
+def from_rows(rows, first=1, decimals=0):
+    """ZeroArray of the zeros written in `rows`. With `decimals` they
+    are also kept exactly with that many decimal places.
+
+    """
+    heights = numpy.array([float(r) for r in rows], dtype=numpy.float64)
+    if not decimals:
+        return ZeroArray(heights, first)
+    count = (decimals + LIMB - 1)/LIMB
+    limbs = numpy.empty((len(rows), count + 1), dtype=numpy.int64)
+    for i, r in enumerate(rows):
+        y = packed._fixed(r, decimals)*10**(count*LIMB - decimals)
+        for j in range(count, 0, -1):
+            y, limbs[i, j] = divmod(y, 10**LIMB)
+        limbs[i, 0] = y
+    return ZeroArray(heights, first, limbs, decimals)
+
+def read(filename, m=1, n=0, first=1, decimals=0):
+    """The zeros m..n (all from m if n is 0) of the table `filename`,
+    whose first zero has index `first`. See `from_rows` for `decimals`.
+
+    """
+    table = tables.Table(filename)
+    start = m - first
+    stop = len(table) if not n else min(n - first + 1, len(table))
+    if decimals:
+        return from_rows(table.text(start, stop), m, decimals)
+    return ZeroArray(table.read(start, stop), m)
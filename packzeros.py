@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+
+"""Write a table of zeros as a compressed .rzt file, or back as text.
+
+"""
+
+import optparse
+
+from lib import packed
+from lib import profiling
+
+if __name__ == '__main__':
+    usage = """
+%prog data/ourzeros105_final.txt data/ourzeros105_final.rzt
+%prog -d 20 -f 1 data/truezeros_109.txt truezeros_109.rzt
+%prog -u data/ourzeros105_final.rzt zeros.txt"""
+    desc = """\
+This program packs a table of zeros, one per line, keeping every decimal
+written in the table, or rounding them to -d decimal places, which loses
+the rest. The packed table can be read by every program that reads
+tables of zeros."""
+    parser = optparse.OptionParser(usage=usage, description=desc)
+    parser.add_option('-d', '--decimals', dest='decimals', action='store',
+                      type='int', default=0, help='Decimal places kept. '\
+                      'The rows are rounded to them. By default all.')
+    parser.add_option('-f', '--first', dest='first', action='store',
+                      type='int', default=1,
+                      help='The index of the first zero of the table.')
+    parser.add_option('-b', '--block', dest='block', action='store',
+                      type='int', default=packed.BLOCK,
+                      help='Zeros in each compressed block.')
+    parser.add_option('-u', '--unpack', dest='unpack', action='store_true',
+                      default=False, help='Write a .rzt table as text.')
+    profiling.add_option(parser)
+    options, args = parser.parse_args()
+    profiling.from_options(options)
+
+    if len(args) != 2:
+        parser.error('You must give the input and output files.')
+    if options.unpack:
+        packed.unpack(args[0], args[1])
+    else:
+        decimals = packed.pack(args[0], args[1], options.decimals,
+                               options.first, options.block)
+        print '%s: %i decimal places' % (args[1], decimals)
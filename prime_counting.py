@@ -12,12 +12,15 @@ import optparse
 
 from lib import prime
 from lib import graphs
+from lib import counting
+from lib import profiling
 
 if __name__ == '__main__':
     usage = """
 %prog -i zeros.txt -n 50 -x 10 -d 0.01 output.txt
 %prog -g -i table.txt output.txt
-%prog -s -i zeros.txt -n 1000 10\
+%prog -s -i zeros.txt -n 1000 10
+%prog -i zeros.txt -t 1000 -x 10 -d 0.01 output.txt\
 """
     desc = """\
 This program computes the number of primes less than -x. It generates
@@ -50,7 +53,22 @@ is the approximation given by Lambert formula.
                       'specific value x passed as argument. Use -i file '\
                       'as the table of zeros. The -n option set the number '\
                       'of zeros used.')
+    parser.add_option('-t', '--height', dest='height', action='store',
+                      type='float', default=0, help='Use all the zeros '\
+                      'below this height instead of -n.')
+    parser.add_option('-f', '--fast', dest='fast', action='store_true',
+                      default=False, help='Render without LaTeX and '\
+                      'without a display (or set RIEMANN_PLOTS=fast).')
+    profiling.add_option(parser)
     options, args = parser.parse_args()
+    profiling.from_options(options)
+
+    if options.fast:
+        graphs.use_profile('fast', headless=True)
+
+    if options.height:
+        options.numzeros = counting.count(options.height)
+        print "Using %i zeros" % options.numzeros
 
     if options.graph:
         if not args:
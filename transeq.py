@@ -11,6 +11,7 @@ Cornell University, Physics Department
 import optparse
 
 from lib import graphs
+from lib import profiling
 
 def transcendental_plot(output):
     t = graphs.Transcendental()
@@ -41,7 +42,15 @@ Plot the transcendental equation which provides the Riemann zeros.
 Ilustrate how the exact solution is modified by the Arg(Zeta(0.5+iy))
 term."""
     parser = optparse.OptionParser(usage=usage, description=desc)
+    parser.add_option('-f', '--fast', dest='fast', action='store_true',
+                      default=False, help='Render without LaTeX and '\
+                      'without a display (or set RIEMANN_PLOTS=fast).')
+    profiling.add_option(parser)
     options, args = parser.parse_args()
+    profiling.from_options(options)
+
+    if options.fast:
+        graphs.use_profile('fast', headless=True)
 
     if not args:
         parser.error('No output file.')
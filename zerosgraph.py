@@ -11,6 +11,7 @@ Cornell University, Physics Department
 import optparse
 
 from lib import graphs
+from lib import profiling
 
 def zeros_graph(input_file, output, m, n, jump, ticks, zoom_n, left, right): 
     """m: the first zero, n: the last zero, jump: the interval to create
@@ -71,7 +72,15 @@ formula, and the numerical solution of the transcendental equation."""
                       default=False, help='Graph to show that m is bounded.')
     parser.add_option('-x', '--cos', dest='cos', action='store_true', 
                       default=False, help='Graph to show the cos/sin.')
+    parser.add_option('-f', '--fast', dest='fast', action='store_true',
+                      default=False, help='Render without LaTeX and '\
+                      'without a display (or set RIEMANN_PLOTS=fast).')
+    profiling.add_option(parser)
     options, args = parser.parse_args()
+    profiling.from_options(options)
+
+    if options.fast:
+        graphs.use_profile('fast', headless=True)
 
     if not args:
         parser.error('No output file.')
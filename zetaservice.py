@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+"""Run the zeros service, or send it jobs.
+
+"""
+
+import os
+import sys
+import optparse
+
+import numpy
+
+from lib import service
+from lib import unfold
+from lib import profiling
+
+if __name__ == '__main__':
+    usage = """
+%prog -s -j 4
+%prog -m 1 -n 100 zeros.txt
+%prog -t pi -i zeros.txt -z 500 -x 20 -d 0.02 pi500.txt
+%prog -t gue -i zeros.txt -m 1 -n 100000 -a 0 -b 1.95 -e 0.05 gue.txt
+%prog -t stats
+%prog -t shutdown
+
+Without an output file the results are written to the screen."""
+    desc = """\
+This program starts a server (-s) that keeps mpmath, the zero tables and
+a pool of processes alive, and answers jobs sent by this same program
+through a unix socket. Jobs with the same or overlapping ranges of zeros
+are computed once, and the results are printed as they arrive."""
+    parser = optparse.OptionParser(usage=usage, description=desc)
+    parser.add_option('-s', '--serve', dest='serve', action='store_true',
+                      default=False, help='Start the server.')
+    parser.add_option('-k', '--socket', dest='socket', action='store',
+                      default=service.SOCKET, help='Socket of the server.')
+    parser.add_option('-j', '--processes', dest='processes', action='store',
+                      type='int', default=0,
+                      help='Processes of the server, by default one per core.')
+    parser.add_option('-p', '--profile', dest='profile', action='store',
+                      default='', help='Profile of the solver for the '\
+                      'server, see genzeros.py -a.')
+    parser.add_option('-t', '--job', dest='job', action='store',
+                      default='zeros',
+                      choices=['zeros', 'pi', 'gue', 'stats', 'shutdown'],
+                      help='zeros, pi, gue, stats or shutdown.')
+    parser.add_option('-m', '--lowest', dest='lowest', action='store',
+                      type='int', help='Index of the lowest zero.')
+    parser.add_option('-n', '--highest', dest='highest', action='store',
+                      type='int', help='Index of the highest zero.')
+    parser.add_option('-i', '--input', dest='input_file', action='store',
+                      default='', help='Table of zeros for pi and gue.')
+    parser.add_option('-f', '--first', dest='first', action='store',
+                      default=1, type='int',
+                      help='The index of the first zero of the table.')
+    parser.add_option('-z', '--numzeros', dest='numzeros', action='store',
+                      type='int', default=100,
+                      help='Number of zeros used for pi.')
+    parser.add_option('-x', '--xvalue', dest='xvalue', action='store',
+                      type='float', default=10.0, help='Largest x for pi.')
+    parser.add_option('-d', '--step', dest='step', action='store',
+                      type='float', default=0.1, help='Step of x for pi.')
+    parser.add_option('-a', '--min', dest='min', action='store',
+                      type='float', default=0.0, help='Lowest alpha.')
+    parser.add_option('-b', '--max', dest='max', action='store',
+                      type='float', default=1.95, help='Highest alpha.')
+    parser.add_option('-e', '--bin', dest='bin', action='store',
+                      type='float', default=0.05, help='Width of the bins.')
+    parser.add_option('-o', '--method', dest='method', action='store',
+                      default='smooth', choices=unfold.METHODS,
+                      help='Unfolding method: %s.' % ', '.join(unfold.METHODS))
+    profiling.add_option(parser)
+    options, args = parser.parse_args()
+    profiling.from_options(options)
+
+    if options.serve:
+        service.serve(options.socket, options.processes or None,
+                      options.profile)
+        sys.exit()
+
+    job = {'job': options.job}
+    if options.job in ('zeros', 'gue'):
+        if not (options.lowest and options.highest):
+            parser.error('You must set --lowest and --highest options.')
+        job.update(m=options.lowest, n=options.highest)
+    if options.job in ('pi', 'gue'):
+        if not options.input_file:
+            parser.error('You must set the --input option.')
+        job['table'] = os.path.abspath(options.input_file)
+    if options.job == 'pi':
+        job.update(zeros=options.numzeros, x=list(numpy.arange(2,
+                   options.xvalue + options.step, options.step)))
+    elif options.job == 'gue':
+        job.update(first=options.first, alpha=[options.min, options.max],
+                   step=options.bin, method=options.method)
+
+    output = open(args[0], 'w') if args else sys.stdout
+    for row in service.request(job, options.socket):
+        if options.job == 'zeros':
+            output.write(('%.20f' + row['mark'] + '\n') % row['zero'])
+        elif options.job == 'pi':
+            output.write('%.5f\t%.2f\t%.12f\n' % (row['x'], row['pi'],
+                                                   row['pi_zeros']))
+        elif options.job == 'gue':
+            output.write('%.4f\t%.10f\t%.10f\n' % (row['x'], row['value'],
+                                                    row['gue']))
+        else:
+            output.write('%s\n' % row)
+        output.flush()